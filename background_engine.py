@@ -1,16 +1,24 @@
 import cv2
-import mediapipe as mp
 import numpy as np
+from parallel import get_default_executor
 
 class BackgroundEngine:
     """Manages real-time background segmentation and replacement with animated layers."""
-    def __init__(self):
-        self.mp_selfie_segmentation = mp.solutions.selfie_segmentation
-        self.segmentor = self.mp_selfie_segmentation.SelfieSegmentation(model_selection=1)
+    def __init__(self, executor=None):
+        self.executor = executor if executor is not None else get_default_executor()
+        self.segmentor = None # Created on first segmentation so compositing works without the model
         self.tick = 0
         self.cap = None
         self.video_path = None
 
+    def get_segmentor(self):
+        """Lazily loads the MediaPipe selfie segmentation model."""
+        if self.segmentor is None:
+            import mediapipe as mp
+            self.mp_selfie_segmentation = mp.solutions.selfie_segmentation
+            self.segmentor = self.mp_selfie_segmentation.SelfieSegmentation(model_selection=1)
+        return self.segmentor
+
     def set_video_background(self, video_path):
         """Sets a video file as the background asset."""
         self.video_path = video_path
@@ -23,6 +31,7 @@ class BackgroundEngine:
         """Creates a composite animated background from multi-layer assets."""
         self.tick += 1
         composite_bg = np.zeros((height, width, 3), dtype=np.uint8)
+        self.executor.count_pass()
         
         for i, layer in enumerate(layers):
             if layer is None: continue
@@ -36,6 +45,7 @@ class BackgroundEngine:
             
             # Loop/Scroll layer
             scrolled = np.roll(layer_resized, offset, axis=1)
+            self.executor.count_pass(2 if i == 0 else 3) # Resize, roll (and add)
             
             # Blend layer into composite
             if i == 0:
@@ -61,16 +71,19 @@ class BackgroundEngine:
                     ret, bg_img = self.cap.read()
                 if bg_img is not None:
                     bg_img = cv2.resize(bg_img, (w, h))
+                    self.executor.count_pass()
 
             if bg_img is None and background_layers is not None:
                 if isinstance(background_layers, list):
                     bg_img = self.get_animated_background(background_layers, w, h)
                 else:
                     bg_img = cv2.resize(background_layers, (w, h))
+                    self.executor.count_pass()
 
         # 2. Convert to RGB for MediaPipe
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.segmentor.process(rgb_frame)
+        self.executor.count_pass()
+        results = self.get_segmentor().process(rgb_frame)
 
         # 3. Create binary mask
         if results.segmentation_mask is None:
@@ -78,13 +91,25 @@ class BackgroundEngine:
             
         mask = results.segmentation_mask > 0.5
         mask_raw = mask.astype(np.float32)
+        self.executor.count_pass(2) # Threshold, float conversion
         
         # 4. Final Blend (only if we have a background image)
         if bg_img is not None:
-            mask_sm = (mask_raw * 255).astype(np.uint8)
-            mask_sm = cv2.GaussianBlur(mask_sm, (7, 7), 0) / 255.0
-            mask_blend = mask_sm[:, :, np.newaxis]
-            composite = (mask_blend * frame + (1 - mask_blend) * bg_img).astype(np.uint8)
-            return composite, mask_raw
+            return self.composite_background(frame, mask_raw, bg_img), mask_raw
         
         return frame, mask_raw
+
+    def composite_background(self, frame, mask_raw, bg_img):
+        """Blends the person (mask_raw, 0..1) over bg_img with a softened mask edge."""
+        mask_sm = (mask_raw * 255).astype(np.uint8)
+        mask_sm = cv2.GaussianBlur(mask_sm, (7, 7), 0) / 255.0
+        mask_blend = mask_sm[:, :, np.newaxis]
+        self.executor.count_pass(4) # Mask scale + cast, blur, normalisation
+        composite = np.empty_like(frame)
+
+        def blend_stripe(y0, y1):
+            m = mask_blend[y0:y1]
+            composite[y0:y1] = (m * frame[y0:y1] + (1 - m) * bg_img[y0:y1]).astype(np.uint8)
+
+        self.executor.run(blend_stripe, frame.shape[0])
+        return composite
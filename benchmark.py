@@ -0,0 +1,460 @@
+"""Micro-benchmarks for EffectsEngine, BackgroundEngine and FinalCompositor primitives on synthetic frames.
+
+Runs without a camera or MediaPipe models: frames, masks, hand positions and background
+layers are generated from fixed seeds. Results (time and allocations) can be saved as a JSON
+baseline and later checked against it, failing when a primitive exceeds its budget.
+
+    python benchmark.py --save                 # record benchmark_baseline.json
+    python benchmark.py --check --budget 0.25  # exit 1 if anything is >25% slower/larger
+    python benchmark.py --scaling              # 1..N thread scaling of the striped passes
+    python benchmark.py --players 1 2 4 8      # per-frame cost and tracking accuracy vs. player count
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from effects_engine import EffectsEngine, MultiPlayerEffects
+from background_engine import BackgroundEngine
+from compositor import FinalCompositor
+from gesture_engine import GestureEngine
+from parallel import get_default_executor
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "4k": (3840, 2160)}
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+def synthetic_frame(w, h, rng):
+    """Camera-like frame: smooth gradient plus sensor noise."""
+    xs = np.linspace(0, 255, w, dtype=np.float32)[None, :]
+    ys = np.linspace(0, 255, h, dtype=np.float32)[:, None]
+    frame = np.stack([0.6 * xs + 0.2 * ys, 0.3 * xs + 0.5 * ys, 0.4 * ys + 40 + 0 * xs], axis=2)
+    frame += rng.normal(0, 6, frame.shape).astype(np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+def synthetic_mask(w, h):
+    """Person-like silhouette (head + torso) as a 0/1 float32 mask."""
+    mask = np.zeros((h, w), dtype=np.uint8)
+    cv2.ellipse(mask, (w // 2, int(h * 0.3)), (int(w * 0.06), int(h * 0.12)), 0, 0, 360, 1, -1)
+    cv2.ellipse(mask, (w // 2, int(h * 0.85)), (int(w * 0.18), int(h * 0.45)), 0, 0, 360, 1, -1)
+    return mask.astype(np.float32)
+
+def synthetic_hands(w, h):
+    """Two hand centers in the Kamehameha pose and their midpoint."""
+    c1 = (int(w * 0.45), int(h * 0.5))
+    c2 = (int(w * 0.55), int(h * 0.5))
+    return c1, c2, ((c1[0] + c2[0]) // 2, (c1[1] + c2[1]) // 2)
+
+def synthetic_asset(size=256):
+    """RGBA energy ball sprite with a radial alpha falloff."""
+    yy, xx = np.mgrid[:size, :size]
+    r = np.sqrt((xx - size / 2) ** 2 + (yy - size / 2) ** 2) / (size / 2)
+    alpha = np.clip(1 - r, 0, 1)
+    asset = np.zeros((size, size, 4), dtype=np.uint8)
+    asset[:, :, 0] = 255 * alpha
+    asset[:, :, 1] = 230 * alpha
+    asset[:, :, 2] = 120 * alpha
+    asset[:, :, 3] = 255 * alpha
+    return asset
+
+def synthetic_hand(cx, cy, label, rng, jitter=0.002):
+    """MediaPipe-shaped hand (21 normalized landmarks, clenched) centered at (cx, cy)."""
+    offsets = np.stack([np.cos(np.linspace(0, 2 * np.pi, 21)), np.sin(np.linspace(0, 2 * np.pi, 21))], axis=1) * 0.03
+    pts = offsets + (cx, cy) + rng.normal(0, jitter, (21, 2))
+    pts[12] = pts[0] + (0.0, -0.05) # Middle fingertip near the wrist: a fist
+    landmarks = SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y)) for x, y in pts])
+    handedness = SimpleNamespace(classification=[SimpleNamespace(label=label)])
+    return landmarks, handedness
+
+SCENARIOS = ("spread", "close", "crossing")
+
+def synthetic_multi_hand_trace(players, frames, fps=30, seed=0, scenario="spread"):
+    """Per-frame (timestamp, hand_results, true hand ids) for several players; hand i belongs to player i // 2.
+
+    spread:   players evenly spaced across the frame, hands side by side.
+    close:    players shoulder to shoulder, so neighbours' hands are about as close as a player's own.
+    crossing: close, but each player's hands repeatedly cross over one another (after entering
+              uncrossed) and neighbouring players swap places, passing above/below each other,
+              with 5% of Left/Right labels flipped.
+    Detection order is shuffled every frame, as MediaPipe does not keep it stable.
+    """
+    rng = np.random.default_rng(seed)
+    spacing = 1.0 / players if scenario == "spread" else min(0.15, 0.9 / players)
+    trace = []
+    for f in range(frames):
+        t = f / fps
+        hands = []
+        for p in range(players):
+            cx = 0.5 + (p - (players - 1) / 2) * spacing
+            cy = 0.5
+            half = 0.02 if scenario == "spread" else 0.03 # Half the distance between a player's hands
+            if scenario == "crossing":
+                # Even/odd neighbours trade places every second, hands cross at 0.4 Hz
+                swap = spacing * (1 - np.cos(np.pi * t)) / 2
+                if p % 2 == 0 and p + 1 < players:
+                    cx += swap
+                elif p % 2 == 1:
+                    cx -= swap
+                cy += 0.08 if p % 2 else -0.08
+                # Players walk in with hands apart, then cross them at slightly different rates
+                half *= np.cos(2 * np.pi * (0.4 + 0.05 * p) * t)
+            else:
+                cx += 0.01 * np.sin(2 * np.pi * 0.5 * t + p)
+                cy += 0.05 * np.sin(2 * np.pi * 0.3 * t + p)
+            # Unmirrored camera: MediaPipe's "Left" (a selfie-view label) is the hand on the image left
+            labels = ["Left", "Right"]
+            if scenario == "crossing":
+                labels = [l if rng.random() >= 0.05 else ("Left" if l == "Right" else "Right") for l in labels]
+            hands.append((2 * p, synthetic_hand(cx - half, cy - 0.01, labels[0], rng)))
+            hands.append((2 * p + 1, synthetic_hand(cx + half, cy + 0.01, labels[1], rng)))
+        order = rng.permutation(len(hands))
+        results = SimpleNamespace(multi_hand_landmarks=[hands[i][1][0] for i in order],
+                                  multi_handedness=[hands[i][1][1] for i in order])
+        trace.append((t, results, [hands[i][0] for i in order]))
+    return trace
+
+def count_correct_pairs(players, true_of_track):
+    """Players whose two tracks are the two hands of one true player (true hand ids 2p, 2p + 1)."""
+    correct = 0
+    for player in players:
+        true_ids = [true_of_track.get(t) for t in player.hand_ids]
+        if None not in true_ids and true_ids[0] // 2 == true_ids[1] // 2 and true_ids[0] != true_ids[1]:
+            correct += 1
+    return correct
+
+def run_players(counts, frames, res, seed, render=True, scenario="spread", log=print):
+    """Times tracking + gesture update and per-player rendering against player count.
+
+    Also scores tracking: id switches (a true hand seen under more than one track id), the
+    number of players formed from a true player's own two hands at the end of the trace, and
+    re-pairs (players dissolved and formed again along the way).
+    """
+    w, h = RESOLUTIONS[res]
+    no_face = SimpleNamespace(multi_face_landmarks=None)
+    report = {}
+    for n in counts:
+        seed_all(seed)
+        trace = synthetic_multi_hand_trace(n, frames, seed=seed, scenario=scenario)
+        gestures, effects = GestureEngine(), MultiPlayerEffects()
+        frame = synthetic_frame(w, h, np.random.default_rng(seed))
+        track_ms, render_ms, identities, true_of_track = [], [], {}, {}
+        for t, results, true_ids in trace:
+            with contextlib.redirect_stdout(io.StringIO()): # Silence per-frame gesture logging
+                start = time.perf_counter()
+                gestures.update(results, no_face, w, h, timestamp=t)
+                track_ms.append((time.perf_counter() - start) * 1000.0)
+            for true_id, track in zip(true_ids, gestures.hand_tracks):
+                identities.setdefault(true_id, set()).add(track.id)
+                true_of_track[track.id] = true_id
+            if render:
+                start = time.perf_counter()
+                effects.draw_players(frame.copy(), gestures.get_players(), 60)
+                render_ms.append((time.perf_counter() - start) * 1000.0)
+
+        id_switches = sum(len(ids) - 1 for ids in identities.values())
+        players = gestures.get_players()
+        r = {"track_ms": float(np.median(track_ms)), "id_switches": id_switches,
+             "players_found": len(players), "pairs_correct": count_correct_pairs(players, true_of_track),
+             "re_pairs": gestures.tracker.next_player_id - len(players)}
+        line = f"{scenario:>8s} {n:2d} players {res:>6s}  track {r['track_ms']:7.3f} ms ({r['track_ms'] / n:6.3f}/player)"
+        if render:
+            r["render_ms"] = float(np.median(render_ms))
+            line += f"  render {r['render_ms']:8.2f} ms ({r['render_ms'] / n:7.2f}/player)"
+        log(line + f"  paired {r['pairs_correct']}/{n} correctly ({r['players_found']} formed)  id switches {id_switches}"
+            f"  re-pairs {r['re_pairs']}")
+        report[n] = r
+    return report
+
+# Each case prepares fresh engine state outside the timed region and returns the call to time.
+def case_additive_blend(w, h, rng):
+    fx = EffectsEngine()
+    frame, overlay = synthetic_frame(w, h, rng), synthetic_frame(w, h, rng) // 4
+    return lambda: fx.additive_blend(frame, overlay)
+
+def case_draw_fractal_lightning(w, h, rng):
+    fx = EffectsEngine()
+    layer = np.zeros((h, w, 3), dtype=np.uint8)
+    c1, c2, _ = synthetic_hands(w, h)
+    return lambda: fx.draw_fractal_lightning(layer, c1, (c2[0], int(h * 0.2)), (200, 255, 255), 2, noise=30)
+
+def case_apply_heat_distortion(w, h, rng):
+    fx = EffectsEngine()
+    frame = synthetic_frame(w, h, rng)
+    _, _, mid = synthetic_hands(w, h)
+    return lambda: fx.apply_heat_distortion(frame, mid, 60)
+
+def case_draw_burst(w, h, rng):
+    fx = EffectsEngine()
+    frame = synthetic_frame(w, h, rng)
+    _, _, mid = synthetic_hands(w, h)
+    return lambda: fx.draw_burst(frame, mid)
+
+def case_draw_energy_ball(w, h, rng):
+    fx = EffectsEngine()
+    frame, asset = synthetic_frame(w, h, rng), synthetic_asset()
+    _, _, mid = synthetic_hands(w, h)
+    # Draws into the same frame every call: the heat distortion compounds in its ROI, which
+    # doesn't change the cost, and the timed call then carries no full-frame copy of its own
+    return lambda: fx.draw_energy_ball(frame, mid, 60, asset=asset, burst=False)
+
+def case_draw_dust(w, h, rng):
+    fx = EffectsEngine()
+    frame = synthetic_frame(w, h, rng)
+    fx.draw_dust(frame)
+    return lambda: fx.draw_dust(frame)
+
+def case_draw_rocks(w, h, rng):
+    fx = EffectsEngine()
+    frame = synthetic_frame(w, h, rng)
+    _, _, mid = synthetic_hands(w, h)
+    for _ in range(30):
+        fx.draw_rocks(frame, mid, 60)
+    return lambda: fx.draw_rocks(frame, mid, 60)
+
+def case_apply_screen_shake(w, h, rng):
+    fx = EffectsEngine()
+    frame = synthetic_frame(w, h, rng)
+    fx.shake_offset = (7, -5)
+    return lambda: fx.apply_screen_shake(frame)
+
+def case_compose(w, h, rng):
+    compositor = FinalCompositor()
+    frame = synthetic_frame(w, h, rng)
+    return lambda: compositor.compose(frame, shake=(7, -5))
+
+def case_draw_body_lightning(w, h, rng):
+    fx = EffectsEngine()
+    frame, mask = synthetic_frame(w, h, rng), synthetic_mask(w, h)
+    return lambda: fx.draw_body_lightning(frame, mask)
+
+def case_get_animated_background(w, h, rng):
+    bg = BackgroundEngine()
+    layers = [synthetic_frame(1280, 720, rng), synthetic_frame(1280, 720, rng) // 3]
+    return lambda: bg.get_animated_background(layers, w, h)
+
+def case_replace_background_composite(w, h, rng):
+    bg = BackgroundEngine()
+    frame, bg_img, mask = synthetic_frame(w, h, rng), synthetic_frame(w, h, rng), synthetic_mask(w, h)
+    return lambda: bg.composite_background(frame, mask, bg_img)
+
+CASES = {
+    "additive_blend": case_additive_blend,
+    "draw_fractal_lightning": case_draw_fractal_lightning,
+    "apply_heat_distortion": case_apply_heat_distortion,
+    "draw_burst": case_draw_burst,
+    "draw_energy_ball": case_draw_energy_ball,
+    "draw_dust": case_draw_dust,
+    "draw_rocks": case_draw_rocks,
+    "apply_screen_shake": case_apply_screen_shake,
+    "compose": case_compose,
+    "draw_body_lightning": case_draw_body_lightning,
+    "get_animated_background": case_get_animated_background,
+    "replace_background_composite": case_replace_background_composite,
+}
+
+# Full-frame passes that run through the stripe executor
+STRIPED_CASES = ["additive_blend", "draw_dust", "draw_rocks", "apply_screen_shake", "compose",
+                 "replace_background_composite"]
+
+def seed_all(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    return np.random.default_rng(seed)
+
+def time_sample(fn, min_ms):
+    """Calls fn until at least min_ms have passed (once at minimum); returns mean milliseconds per call."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = (time.perf_counter() - start) * 1000.0
+        if elapsed >= min_ms:
+            return elapsed / calls
+
+def run_case(name, w, h, repeat=5, warmup=1, seed=0, min_ms=50.0):
+    """Times one primitive; returns median/min milliseconds per call and peak traced allocation in bytes.
+
+    Each sample repeats the call for at least min_ms so sub-millisecond primitives are not
+    dominated by timer resolution and scheduler noise.
+    """
+    times = []
+    for i in range(warmup + repeat):
+        fn = CASES[name](w, h, seed_all(seed))
+        seed_all(seed + 1)
+        elapsed = time_sample(fn, min_ms)
+        if i >= warmup:
+            times.append(elapsed)
+
+    # Allocations are measured on a separate call so tracing overhead does not skew timing
+    fn = CASES[name](w, h, seed_all(seed))
+    seed_all(seed + 1)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median_ms": float(np.median(times)), "min_ms": float(min(times)), "peak_alloc_bytes": int(peak)}
+
+def run_all(names, resolutions, repeat, seed, min_ms=50.0, log=print):
+    results = {}
+    for res in resolutions:
+        w, h = RESOLUTIONS[res]
+        for name in names:
+            r = run_case(name, w, h, repeat=repeat, seed=seed, min_ms=min_ms)
+            results[f"{name}@{res}"] = r
+            log(f"{name:30s} {res:>6s} {r['median_ms']:9.2f} ms  {r['peak_alloc_bytes'] / 1e6:8.1f} MB")
+    return results
+
+def thread_counts(max_threads):
+    """1, 2, 4, ... up to and including max_threads."""
+    counts, n = [], 1
+    while n < max_threads:
+        counts.append(n)
+        n *= 2
+    return counts + [max_threads]
+
+def run_scaling(names, resolutions, max_threads, repeat, seed, min_ms=50.0, log=print):
+    """Times striped primitives from 1 to max_threads stripes and checks outputs stay bit-identical."""
+    executor = get_default_executor()
+    original = executor.stripes
+    curves = {}
+    try:
+        for res in resolutions:
+            w, h = RESOLUTIONS[res]
+            for name in names:
+                executor.set_stripes(1)
+                reference = CASES[name](w, h, seed_all(seed))()
+                curve = {}
+                for n in thread_counts(max_threads):
+                    executor.set_stripes(n)
+                    output = CASES[name](w, h, seed_all(seed))()
+                    if not np.array_equal(output, reference):
+                        raise AssertionError(f"{name}@{res}: {n} stripes differ from single-threaded output")
+                    curve[n] = run_case(name, w, h, repeat=repeat, seed=seed, min_ms=min_ms)["median_ms"]
+                curves[f"{name}@{res}"] = curve
+                base = curve[1]
+                log(f"{name:30s} {res:>6s} " + "  ".join(f"{n}t {ms:7.2f}ms x{base / ms:4.1f}" for n, ms in curve.items()))
+    finally:
+        executor.set_stripes(original)
+    return curves
+
+def check_regressions(results, baseline, budget, floor_ms=0.05):
+    """Returns a list of messages for primitives slower or allocating more than baseline * (1 + budget).
+
+    A slowdown must also exceed floor_ms in absolute terms, so jitter on very fast primitives
+    doesn't count as a regression.
+    """
+    failures = []
+    budgets = baseline.get("budgets", {})
+    for key, r in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        limit = 1.0 + budgets.get(key.split("@")[0], budget)
+        if r["median_ms"] > base["median_ms"] * limit and r["median_ms"] - base["median_ms"] > floor_ms:
+            failures.append(f"{key}: {r['median_ms']:.2f} ms > {base['median_ms']:.2f} ms x {limit:.2f}")
+        if r["peak_alloc_bytes"] > base["peak_alloc_bytes"] * limit:
+            failures.append(f"{key}: {r['peak_alloc_bytes']} B > {base['peak_alloc_bytes']} B x {limit:.2f}")
+    return failures
+
+def load_baseline(path):
+    """Reads a saved baseline, or prints why it can't and returns None."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read baseline {path} ({e}); record one with --save first.", file=sys.stderr)
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS), default=list(RESOLUTIONS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail on regressions against the baseline")
+    parser.add_argument("--budget", type=float, default=0.2, help="allowed fractional regression (default 0.2)")
+    parser.add_argument("--floor-ms", type=float, default=0.05,
+                        help="slowdowns smaller than this never count as regressions (default 0.05)")
+    parser.add_argument("--min-ms", type=float, default=50.0,
+                        help="repeat each timing sample for at least this long (default 50)")
+    parser.add_argument("--stripes", type=int, default=None, help="stripe/thread count (default: CPU count)")
+    parser.add_argument("--scaling", action="store_true", help="report 1..N thread scaling of striped passes")
+    parser.add_argument("--max-threads", type=int, default=None, help="upper bound for --scaling (default: CPU count)")
+    parser.add_argument("--players", type=int, nargs="+", help="benchmark tracking/rendering for these player counts")
+    parser.add_argument("--frames", type=int, default=30, help="trace length for --players")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS),
+                        help="hand layouts for --players (default: all)")
+    parser.add_argument("--no-render", action="store_true", help="with --players, time tracking only")
+    args = parser.parse_args(argv)
+
+    cv2.setRNGSeed(args.seed)
+    executor = get_default_executor()
+    if args.stripes is not None:
+        executor.set_stripes(args.stripes)
+
+    if args.players:
+        for scenario in args.scenarios:
+            run_players(args.players, args.frames, args.resolutions[0], args.seed,
+                        render=not args.no_render, scenario=scenario)
+        return 0
+
+    if args.scaling:
+        names = [n for n in args.only if n in STRIPED_CASES]
+        resolutions = [r for r in args.resolutions if r != "720p"] or args.resolutions
+        run_scaling(names, resolutions, args.max_threads or executor.stripes, args.repeat, args.seed,
+                    min_ms=args.min_ms)
+        return 0
+
+    # Fail before the (long) run when there is nothing to check against
+    baseline = None
+    if args.check and not args.save:
+        baseline = load_baseline(args.baseline)
+        if baseline is None:
+            return 1
+
+    results = run_all(args.only, args.resolutions, args.repeat, args.seed, min_ms=args.min_ms)
+
+    if args.save:
+        # Keep per-primitive budget overrides from an existing baseline
+        budgets = {}
+        try:
+            with open(args.baseline) as f:
+                budgets = json.load(f).get("budgets", {})
+        except (OSError, ValueError):
+            pass
+        payload = {
+            "meta": {"python": platform.python_version(), "opencv": cv2.__version__, "numpy": np.__version__,
+                     "machine": platform.machine(), "repeat": args.repeat, "seed": args.seed,
+                     "min_ms": args.min_ms, "stripes": executor.stripes},
+            "budgets": budgets,
+            "results": results,
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(payload, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.check:
+        baseline = baseline or load_baseline(args.baseline)
+        if baseline is None:
+            return 1
+        failures = check_regressions(results, baseline, args.budget, args.floor_ms)
+        for msg in failures:
+            print(f"REGRESSION {msg}")
+        if failures:
+            return 1
+        print("All primitives within budget.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
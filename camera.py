@@ -1,18 +1,40 @@
 import cv2
+import time
 
 class Camera:
     """Helper class for webcam access and frame acquisition."""
-    def __init__(self, camera_id=0, width=1280, height=720):
+    def __init__(self, camera_id=0, width=1280, height=720, capture_latency=0.0):
         self.cap = cv2.VideoCapture(camera_id)
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # Sensor + driver + buffer delay (seconds) assumed when the backend has no frame timestamp
+        self.capture_latency = capture_latency
+        self.last_read_time = None # When read() returned for the most recent frame (time.time())
+        self.last_timestamp = None # Estimated capture time of the most recent frame (time.time())
         
     def get_frame(self):
         """Captures a frame and returns it."""
         success, frame = self.cap.read()
         if not success:
             return None
+        self.last_read_time = time.time()
+        self.last_timestamp = self.capture_timestamp(self.last_read_time)
         return frame
+
+    def capture_timestamp(self, read_time):
+        """Estimates when the frame just read was captured, on the time.time() clock.
+
+        read_time is when read() finished, which is later than the exposure by the sensor readout,
+        driver and buffer queue. Backends that timestamp buffers on the monotonic clock (V4L2)
+        report it through CAP_PROP_POS_MSEC and that age is used; otherwise capture_latency is.
+        """
+        pos_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if pos_ms > 0:
+            age = time.monotonic() - pos_ms / 1000.0
+            # Other backends report stream position instead, which doesn't land in this window
+            if 0.0 <= age < 1.0:
+                return read_time - age
+        return read_time - self.capture_latency
     
     def release(self):
         """Releases the camera."""
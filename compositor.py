@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+from parallel import get_default_executor
+
+class FinalCompositor:
+    """Fused last stage: screen shake and HUD in a single striped pass over a reused buffer.
+
+    Also reports the full-frame passes each frame took, as counted on the shared executor: every
+    striped pass plus the full-frame conversions, copies and allocations the engines, trackers
+    and main loop record with count_pass(). Work inside MediaPipe's models is not counted.
+    """
+    def __init__(self, font=cv2.FONT_HERSHEY_SIMPLEX, executor=None):
+        self.font = font
+        self.executor = executor or get_default_executor()
+        self.output = None
+        self.hud_cache = {}
+        # Full-frame memory passes of the last frame and over all frames
+        self.passes = 0
+        self.frames = 0
+        self.total_passes = 0
+
+    def _get_output(self, frame):
+        """Returns the preallocated output buffer, reallocating only when the frame size changes."""
+        if self.output is None or self.output.shape != frame.shape or self.output.dtype != frame.dtype:
+            self.output = np.empty_like(frame)
+        return self.output
+
+    def get_hud_sprite(self, text, scale, color, thickness):
+        """Rasterizes a HUD line once and caches it as a (color, coverage, text origin) tuple."""
+        key = (text, scale, color, thickness)
+        if key not in self.hud_cache:
+            (tw, th), baseline = cv2.getTextSize(text, self.font, scale, thickness)
+            pad = thickness + 1
+            # Draw white on black so anti-aliased edges become fractional coverage
+            coverage = np.zeros((th + baseline + 2 * pad, tw + 2 * pad), dtype=np.uint8)
+            cv2.putText(coverage, text, (pad, th + pad), self.font, scale, 255, thickness)
+            alpha = (coverage.astype(np.float32) / 255.0)[:, :, None]
+            self.hud_cache[key] = (np.float32(color), alpha, (pad, th + pad))
+        return self.hud_cache[key]
+
+    def compose(self, frame, shake=(0, 0), hud=None):
+        """Writes frame shifted by shake into the output buffer and closes the frame's pass count.
+
+        hud is a list of (text, origin, scale, color, thickness) entries, drawn as cached sprites
+        at their shaken positions.
+        """
+        h, w = frame.shape[:2]
+        out = self._get_output(frame)
+        dx, dy = int(shake[0]), int(shake[1])
+
+        # Integer shake: destination/source windows of the same size, border filled with black
+        dx0, dx1 = max(0, dx), min(w, w + dx)
+
+        def shift_stripe(y0, y1):
+            # Rows of this stripe that have a source row, i.e. fall inside the shifted frame
+            r0, r1 = max(y0, dy), min(y1, h + dy)
+            if r1 <= r0 or dx1 <= dx0:
+                out[y0:y1] = 0
+                return
+            if r0 > y0: out[y0:r0] = 0
+            if r1 < y1: out[r1:y1] = 0
+            if dx0 > 0: out[r0:r1, :dx0] = 0
+            if dx1 < w: out[r0:r1, dx1:] = 0
+            np.copyto(out[r0:r1, dx0:dx1], frame[r0 - dy:r1 - dy, dx0 - dx:dx1 - dx])
+
+        self.executor.run(shift_stripe, h)
+
+        if hud:
+            for text, origin, scale, color, thickness in hud:
+                self.blit_sprite(out, self.get_hud_sprite(text, scale, color, thickness),
+                                 (origin[0] + dx, origin[1] + dy))
+
+        self.passes = self.executor.take_pass_count()
+        self.frames += 1
+        self.total_passes += self.passes
+        return out
+
+    def blit_sprite(self, out, cached, origin):
+        """Blends a cached HUD sprite into out with its text baseline at origin."""
+        color, alpha, (pad, ascent) = cached
+        h, w = out.shape[:2]
+        x, y = origin[0] - pad, origin[1] - ascent
+        sh, sw = alpha.shape[:2]
+        y0, y1 = max(0, y), min(h, y + sh)
+        x0, x1 = max(0, x), min(w, x + sw)
+        if y1 <= y0 or x1 <= x0: return
+        a = alpha[y0 - y:y1 - y, x0 - x:x1 - x]
+        roi = out[y0:y1, x0:x1]
+        roi[:] = (roi * (1.0 - a) + color * a + 0.5).astype(np.uint8)
+
+    def report(self):
+        """Returns the average full-frame passes per frame across the whole render."""
+        if self.frames == 0:
+            return "Compositor: no frames"
+        return f"Compositor: {self.total_passes / self.frames:.2f} full-frame passes/frame"
@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
 import random
+from parallel import get_default_executor
 
 class Particle:
     """Represents a single energy fragment."""
@@ -15,25 +16,109 @@ class Particle:
 
 class EffectsEngine:
     """Advanced AR effects engine with cinematic lighting and physics-based visuals."""
-    def __init__(self):
+    def __init__(self, executor=None):
         self.tick = 0
+        # Full-frame per-pixel passes are split into stripes across this thread pool
+        self.executor = executor if executor is not None else get_default_executor()
         self.particles = []
         self.dust_particles = []
         self.rock_particles = []
         self.burst_timer = 0
         self.shake_offset = (0, 0)
+        # Off for per-player instances, where the scene-wide dust is drawn once by the caller
+        self.ambient_dust = True
+        # Off when another engine has already flashed the screen this frame
+        self.scene_flash = True
         # Color Palette: Yellow/Gold/White
         self.color_outer = (20, 150, 255) # Golden yellow in BGR
         self.color_mid = (50, 220, 255)   # Bright yellow
         self.color_spark = (200, 255, 255) # White-yellow
+        # Bloom: glow sigma as a fraction of frame height (~15px at 720p)
+        self.bloom_radius = 0.021
+        self.bloom_levels = 3
+        # Weight of each finer level relative to the one below it. 0 keeps only the coarsest level,
+        # which reproduces the original 99x99 Gaussian glow; > 0 adds tighter cores on top.
+        self.bloom_falloff = 0.0
 
-    def additive_blend(self, background, overlay):
-        """Standard Linear Dodge (Add) blending with dynamic scene exposure."""
-        # Brighten background slightly based on overlay intensity (Exposure)
-        exposure = cv2.addWeighted(background, 1.0, background, 0.05, 0)
-        added = cv2.add(exposure, overlay)
+    def additive_blend(self, background, overlay, flash=0.0):
+        """Standard Linear Dodge (Add) blending with dynamic scene exposure.
+
+        flash > 0 also blends the result toward white by that amount, in the same pass.
+        """
+        # Brighten background slightly based on overlay intensity (Exposure), then add the overlay;
+        # a flash scales both and lifts toward white: (1 - f) * (1.05 * bg + overlay) + 255 * f
+        keep = 1.0 - flash
+        added = np.empty_like(background)
+        self.executor.run(
+            lambda y0, y1: cv2.addWeighted(background[y0:y1], 1.05 * keep, overlay[y0:y1], keep, 255.0 * flash,
+                                           dst=added[y0:y1]),
+            background.shape[0]
+        )
         return added
 
+    def parallel_copy(self, frame):
+        """Striped equivalent of frame.copy()."""
+        out = np.empty_like(frame)
+        self.executor.run(lambda y0, y1: np.copyto(out[y0:y1], frame[y0:y1]), frame.shape[0])
+        return out
+
+    def parallel_add_weighted(self, src1, alpha, src2, beta):
+        """Striped equivalent of cv2.addWeighted(src1, alpha, src2, beta, 0)."""
+        out = np.empty_like(src1)
+        self.executor.run(
+            lambda y0, y1: cv2.addWeighted(src1[y0:y1], alpha, src2[y0:y1], beta, 0, dst=out[y0:y1]),
+            src1.shape[0]
+        )
+        return out
+
+    def apply_bloom(self, layer):
+        """Pyramid bloom: blurs at reduced resolution and accumulates the levels back up.
+
+        Levels are returned to frame size with pyrUp, which shares pyrDown's sampling grid
+        so the glow stays centred. bloom_falloff = 0 keeps only the coarsest level.
+        """
+        h, w = layer.shape[:2]
+        sigma = self.bloom_radius * h
+        levels = max(1, int(self.bloom_levels))
+
+        # Mirror a ~3 sigma margin at full resolution, so the frame edge reflects like a plain
+        # GaussianBlur instead of about each coarse level's own edge. Multiple of 2**levels keeps the crop aligned.
+        step = 2 ** levels
+        pad = int(np.ceil(3 * sigma / step)) * step
+        padded = cv2.copyMakeBorder(layer, pad, pad, pad, pad, cv2.BORDER_REFLECT_101)
+        self.executor.count_pass(3) # Border copy, first pyrDown, final pyrUp
+
+        # Downsample through the pyramid (each pyrDown adds ~1px sigma at its source scale)
+        pyramid = [padded]
+        for _ in range(levels):
+            pyramid.append(cv2.pyrDown(pyramid[-1]))
+
+        # Coarse-to-fine accumulation; the coarsest level carries the full glow radius
+        acc = None
+        weight_sum = 0.0
+        for i in range(levels, 0, -1):
+            if acc is not None:
+                lh, lw = pyramid[i].shape[:2]
+                acc = cv2.pyrUp(acc, dstsize=(lw, lh))
+            weight = self.bloom_falloff ** (levels - i)
+            if weight <= 0:
+                continue
+            # Level i is blurred by i pyrDowns on the way down and i pyrUps on the way back
+            target = sigma / (2 ** (levels - i))
+            residual = (target ** 2 - 2 * (4 ** i - 1) / 3.0) / (4 ** i)
+            blurred = pyramid[i].astype(np.float32)
+            if residual > 0.01:
+                level_sigma = np.sqrt(residual)
+                ksize = 2 * int(np.ceil(3 * level_sigma)) + 1
+                blurred = cv2.GaussianBlur(blurred, (ksize, ksize), level_sigma)
+            acc = blurred * weight if acc is None else acc + blurred * weight
+            weight_sum += weight
+
+        # Single full-resolution pass: upsample the 8-bit result straight to frame size
+        acc = np.clip(acc / weight_sum + 0.5, 0, 255).astype(np.uint8)
+        ph, pw = padded.shape[:2]
+        return cv2.pyrUp(acc, dstsize=(pw, ph))[pad:pad + h, pad:pad + w]
+
     def draw_fractal_lightning(self, frame, start_p, end_p, color, thickness=2, noise=20):
         """Recursively draws jagged, branching electrical arcs."""
         if np.linalg.norm(np.array(start_p) - np.array(end_p)) < 10:
@@ -89,11 +174,12 @@ class EffectsEngine:
         frame[y1:y2, x1:x2] = distorted_roi
         return frame
 
-    def draw_burst(self, frame, center):
-        """Creates an intense, forward-expanding energy blast."""
+    def draw_burst(self, frame, center, flash=0.0):
+        """Creates an intense, forward-expanding energy blast, optionally with a white scene flash."""
         if center is None: return frame
         h, w = frame.shape[:2]
         layer = np.zeros_like(frame)
+        self.executor.count_pass()
         
         # Expanding concentric rings (Shockwaves)
         for i in range(3):
@@ -103,7 +189,7 @@ class EffectsEngine:
         
         # Massive Bloom Burst (Yellow)
         cv2.circle(layer, center, 400, (0, 180, 255), -1)
-        layer = cv2.GaussianBlur(layer, (99, 99), 0)
+        layer = self.apply_bloom(layer)
         
         # Branching lightning firing everywhere (Yellow-White)
         for _ in range(8):
@@ -111,7 +197,7 @@ class EffectsEngine:
             end_p = (int(center[0] + 600 * np.cos(angle)), int(center[1] + 600 * np.sin(angle)))
             self.draw_fractal_lightning(layer, center, end_p, (220, 255, 255), 4, noise=100)
             
-        return self.additive_blend(frame, layer)
+        return self.additive_blend(frame, layer, flash)
 
     def draw_energy_ball(self, frame, center, radius, asset=None, burst=False):
         """Main rendering pipeline for the cinematic energy ball."""
@@ -125,11 +211,9 @@ class EffectsEngine:
         intensity = 0
         if self.burst_timer > 0:
             intensity = 15 # Strong shake during burst
-            frame = self.draw_burst(frame, center)
-            # Add scene flash (stronger at start of burst)
-            flash_intensity = (self.burst_timer / 10.0) * 0.4
-            flash = np.full_like(frame, 255)
-            frame = cv2.addWeighted(frame, (1.0 - flash_intensity), flash, flash_intensity, 0)
+            # Add scene flash (stronger at start of burst), fused into the burst's blend
+            flash_intensity = (self.burst_timer / 10.0) * 0.4 if self.scene_flash else 0.0
+            frame = self.draw_burst(frame, center, flash=flash_intensity)
             self.burst_timer -= 1
             # When bursting, we skip the normal energy ball drawing
             # But we update shake_offset
@@ -151,11 +235,13 @@ class EffectsEngine:
 
         # 1. Apply Heat Haze, Dust, and Rocks
         frame = self.apply_heat_distortion(frame, center, radius)
-        frame = self.draw_dust(frame)
+        if self.ambient_dust:
+            frame = self.draw_dust(frame)
         frame = self.draw_rocks(frame, center, radius)
         
         # 2. Create a transparent black overlay for additive blending
         effect_layer = np.zeros_like(frame)
+        self.executor.count_pass()
         
         # 3. Dynamic Scale (Pulse)
         pulse = 1.0 + 0.15 * np.sin(self.tick * 0.4)
@@ -168,7 +254,7 @@ class EffectsEngine:
         cv2.circle(effect_layer, center, int(r_dyn * 1.8), (50, 200, 255), -1)
         
         # Apply heavy blur to halos
-        effect_layer = cv2.GaussianBlur(effect_layer, (99, 99), 0)
+        effect_layer = self.apply_bloom(effect_layer)
 
         # 5. Fractal Lightning Arcs (Yellow)
         for _ in range(4):
@@ -218,7 +304,7 @@ class EffectsEngine:
                     'alpha': random.uniform(0.1, 0.4)
                 })
 
-        overlay = frame.copy()
+        overlay = self.parallel_copy(frame)
         for p in self.dust_particles:
             p['pos'][0] += p['vel'][0]
             p['pos'][1] += p['vel'][1]
@@ -228,7 +314,7 @@ class EffectsEngine:
             
             cv2.circle(overlay, (int(p['pos'][0]), int(p['pos'][1])), p['size'], (100, 150, 200), -1) # Dust color
 
-        return cv2.addWeighted(frame, 0.6, overlay, 0.4, 0) # Thicker dust
+        return self.parallel_add_weighted(frame, 0.6, overlay, 0.4) # Thicker dust
 
     def draw_rocks(self, frame, center, radius):
         """Draws flying debris/rocks that lift off the ground."""
@@ -243,7 +329,7 @@ class EffectsEngine:
                 'rot_speed': random.uniform(-10, 10)
             })
 
-        overlay = frame.copy()
+        overlay = self.parallel_copy(frame)
         for p in self.rock_particles[:]:
             p['pos'][0] += p['vel'][0]
             p['pos'][1] += p['vel'][1]
@@ -262,14 +348,25 @@ class EffectsEngine:
             ], np.int32)
             cv2.fillPoly(overlay, [pts], (40, 60, 80)) # Dark rock color
 
-        return cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
+        return self.parallel_add_weighted(frame, 0.7, overlay, 0.3)
 
     def apply_screen_shake(self, frame):
-        """Applies the calculated shake offset to the entire frame."""
+        """Applies the calculated shake offset to the entire frame.
+
+        The main loop shakes in FinalCompositor.compose instead, fused with the HUD; this is the
+        standalone version for callers without a compositor.
+        """
         if self.shake_offset == (0, 0): return frame
         h, w = frame.shape[:2]
-        matrix = np.float32([[1, 0, self.shake_offset[0]], [0, 1, self.shake_offset[1]]])
-        return cv2.warpAffine(frame, matrix, (w, h))
+        out = np.empty_like(frame)
+
+        def shake_stripe(y0, y1):
+            # Same translation, expressed relative to the stripe's first output row
+            matrix = np.float32([[1, 0, self.shake_offset[0]], [0, 1, self.shake_offset[1] - y0]])
+            cv2.warpAffine(frame, matrix, (w, y1 - y0), dst=out[y0:y1])
+
+        self.executor.run(shake_stripe, h)
+        return out
 
     def draw_body_lightning(self, frame, mask):
         """Draws electric arcs crawling around the user's silhouette."""
@@ -282,6 +379,7 @@ class EffectsEngine:
         mask_uint8 = (mask * 255).astype(np.uint8)
         edges = cv2.Canny(mask_uint8, 100, 200)
         edge_pts = np.argwhere(edges > 0)
+        self.executor.count_pass(6) # Layer, mask scale + cast, Canny, edge compare + scan
         
         if len(edge_pts) > 10:
             for _ in range(5):
@@ -296,3 +394,52 @@ class EffectsEngine:
                     self.draw_fractal_lightning(layer, p1, p2, (200, 255, 255), 1, noise=15)
 
         return self.additive_blend(frame, layer)
+
+class MultiPlayerEffects:
+    """Keeps one EffectsEngine per player plus a scene engine for effects drawn once per frame."""
+    def __init__(self, executor=None):
+        self.executor = executor if executor is not None else get_default_executor()
+        self.scene = EffectsEngine(self.executor)
+        self.players = {}
+        self.drawn = []
+        self.shake_offset = (0, 0)
+
+    def get_player_effects(self, player_id):
+        """Returns the player's EffectsEngine, creating it on first use."""
+        if player_id not in self.players:
+            fx = EffectsEngine(self.executor)
+            fx.ambient_dust = False
+            self.players[player_id] = fx
+        return self.players[player_id]
+
+    def draw_body_lightning(self, frame, mask):
+        return self.scene.draw_body_lightning(frame, mask)
+
+    def draw_players(self, frame, players, radius, asset=None):
+        """Draws an energy ball (or burst) for every player with an energy center."""
+        # Drop effect state (particles, burst timers) of players that left
+        live_ids = {p.id for p in players}
+        for player_id in list(self.players):
+            if player_id not in live_ids:
+                del self.players[player_id]
+
+        active = [p for p in players if p.energy_center is not None]
+        self.drawn = []
+        # Dust is scene-wide: draw it once if any player is charging rather than bursting
+        if any(not p.burst_triggered and self.get_player_effects(p.id).burst_timer == 0 for p in active):
+            frame = self.scene.draw_dust(frame)
+
+        flashed = False
+        for player in active:
+            fx = self.get_player_effects(player.id)
+            bursting = player.burst_triggered or fx.burst_timer > 0
+            # Several bursts in one frame still flash the screen only once
+            fx.scene_flash = not flashed
+            frame = fx.draw_energy_ball(frame, player.energy_center, radius, asset=asset, burst=player.burst_triggered)
+            flashed = flashed or bursting
+            self.drawn.append(fx)
+
+        # The strongest tremor wins; the screen only shakes once
+        self.shake_offset = max((fx.shake_offset for fx in self.drawn),
+                                key=lambda s: s[0] ** 2 + s[1] ** 2, default=(0, 0))
+        return frame
@@ -1,4 +1,5 @@
 import cv2
+from parallel import get_default_executor
 try:
     import mediapipe as mp
     from mediapipe.python.solutions import face_mesh as mp_face_mesh
@@ -13,7 +14,8 @@ except ImportError:
 class FaceTracker:
     """MediaPipe Face Mesh integration for 468 landmarks."""
     def __init__(self, static_image_mode=False, max_num_faces=1, refine_landmarks=True, 
-                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5, executor=None):
+        self.executor = executor if executor is not None else get_default_executor()
         self.mp_face_mesh = mp_face_mesh
         self.face_mesh = self.mp_face_mesh.FaceMesh(
             static_image_mode=static_image_mode,
@@ -28,6 +30,7 @@ class FaceTracker:
     def process(self, frame):
         """Processes the frame and returns landmarks."""
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.executor.count_pass()
         results = self.face_mesh.process(rgb_frame)
         return results
 
@@ -1,103 +1,130 @@
 import time
 import numpy as np
-from utils import get_hand_center, calculate_velocity
+from utils import get_landmark_array, calculate_velocity
+from player_tracker import PlayerTracker
 
 class GestureEngine:
-    """State machine for detecting face swipes and Kamehameha poses."""
-    def __init__(self):
-        self.last_hand_pos = [None, None]
-        self.last_hand_areas = [0, 0]
+    """State machine for detecting face swipes and Kamehameha poses, per player."""
+    def __init__(self, tracker=None):
         self.swipe_triggered = False
         self.energy_triggered = False
         self.burst_triggered = False
-        self.hand_openness = [0, 0] # 0 = Fist, 1 = Palm
-        self.last_time = time.time()
         self.tick = 0
+        # Hands keep stable identities across frames and are paired into players
+        self.tracker = tracker if tracker is not None else PlayerTracker()
+        self.hand_tracks = []
+        # Filtered hand positions are predicted forward by the measured capture-to-display latency
+        self.latency = 0.0
 
-    def update(self, hand_results, face_results, width, height):
-        """Updates gesture states based on new tracking data."""
-        current_time = time.time()
-        dt = current_time - self.last_time
-        self.last_time = current_time
+    def update(self, hand_results, face_results, width, height, timestamp=None):
+        """Updates gesture states based on new tracking data captured at timestamp (defaults to now)."""
+        current_time = timestamp if timestamp is not None else time.time()
         self.tick += 1
 
         # Reset per frame
         self.energy_triggered = False
         self.burst_triggered = False
 
-        if not hand_results.multi_hand_landmarks:
-            self.last_hand_pos = [None, None]
-            return
+        detections = []
+        if hand_results.multi_hand_landmarks:
+            handedness = getattr(hand_results, "multi_handedness", None) or []
+            for i, hand_landmarks in enumerate(hand_results.multi_hand_landmarks):
+                norm = get_landmark_array(hand_landmarks)
+                label = handedness[i].classification[0].label if i < len(handedness) else None
+                detections.append((norm * (width, height), norm, label))
+
+        self.hand_tracks = self.tracker.update(detections, width, current_time)
+        self.tracker.predict(self.latency)
 
-        hand_centers = []
-        for hand_landmarks in hand_results.multi_hand_landmarks:
-            center = get_hand_center(hand_landmarks, width, height)
-            hand_centers.append(center)
-
-        # Detect Kamehameha Pose (Hands close together) - CHECK THIS FIRST to block swipes
-        in_kamehameha_zone = False
-        if len(hand_centers) >= 2:
-            dist = calculate_velocity(hand_centers[0], hand_centers[1], dt=1.0)
-            
-            # Detect Hand Openness (Fist vs Palm)
-            self.hand_openness = []
-            for hl in hand_results.multi_hand_landmarks:
-                p_center = hl.landmark[0]
-                m_tip = hl.landmark[12]
-                tip_dist = np.sqrt((p_center.x - m_tip.x)**2 + (p_center.y - m_tip.y)**2)
-                # Normalize: fist is around 0.1, full palm around 0.3+
-                openness = np.clip((tip_dist - 0.1) / 0.2, 0, 1)
-                self.hand_openness.append(openness)
-            
-            avg_openness = sum(self.hand_openness) / len(self.hand_openness) if self.hand_openness else 0
-
-            # Increased distance threshold to 400 for better stability
-            if dist < 400:
-                in_kamehameha_zone = True
-                self.energy_triggered = True
-                
-                # Calculate current combined hand area
-                current_total_area = 0
-                for hl in hand_results.multi_hand_landmarks:
-                    xs = [lm.x for lm in hl.landmark]
-                    ys = [lm.y for lm in hl.landmark]
-                    current_total_area += (max(xs) - min(xs)) * (max(ys) - min(ys))
-                
-                # Continuous Burst Hysteresis:
-                # Trigger at 0.4, but stay bursting until it drops below 0.25
-                threshold = 0.25 if self.burst_triggered else 0.4
-                if sum(self.last_hand_areas) > 0 and avg_openness > threshold:
-                    self.burst_triggered = True
-                
-                # Maintain base area for charge tracking
-                if sum(self.last_hand_areas) == 0 and avg_openness < 0.5:
-                    self.last_hand_areas = [current_total_area, 0]
-                    print(f"Charge Initiated. Base Area: {current_total_area:.4f}")
-
-                if self.tick % 5 == 0:
-                    state = "BURSTING" if self.burst_triggered else "CHARGING"
-                    print(f"SJ Mode: {state} | O: {avg_openness:.2f}")
-            else:
-                self.last_hand_areas = [0, 0]
-
-        # Detect Face Swipe - ONLY if not trying to do a Kamehameha
-        if not in_kamehameha_zone and face_results.multi_face_landmarks and len(hand_centers) > 0:
+        # Detect Kamehameha Pose per player (Hands close together) - CHECK THIS FIRST to block swipes
+        any_in_zone = False
+        for player in self.get_players():
+            self.update_player(player)
+            any_in_zone = any_in_zone or player.in_kamehameha_zone
+            self.energy_triggered = self.energy_triggered or player.energy_triggered
+            self.burst_triggered = self.burst_triggered or player.burst_triggered
+
+        # Detect Face Swipe - ONLY if nobody is trying to do a Kamehameha
+        if not any_in_zone and face_results.multi_face_landmarks and self.hand_tracks:
             face_landmarks = face_results.multi_face_landmarks[0]
             nose_tip = face_landmarks.landmark[1]
             nose_x = int(nose_tip.x * width)
-            
-            for i, hand_center in enumerate(hand_centers):
-                prev_pos = self.last_hand_pos[i] if i < len(self.last_hand_pos) else None
-                if prev_pos:
+
+            for track in self.hand_tracks:
+                prev_pos, hand_center = track.prev_center, track.center
+                if prev_pos and track.prev_time is not None:
                     if (prev_pos[0] < nose_x < hand_center[0]) or (hand_center[0] < nose_x < prev_pos[0]):
+                        dt = max(track.time - track.prev_time, 1e-3)
                         velocity = calculate_velocity(prev_pos, hand_center, dt)
                         if velocity > 300:
                             self.swipe_triggered = True
-                            print(f"Swipe detected! Velocity: {int(velocity)}")
+                            print(f"Swipe detected! Hand {track.id} Velocity: {int(velocity)}")
+
+    def update_player(self, player):
+        """Runs the charge/burst state machine for one player's pair of hands."""
+        hands = self.tracker.player_hands(player)
+        if hands is None:
+            # A hand is missing for a few frames (the player dissolves once it exceeds max_missed):
+            # hold the last charge/burst state so a detection dropout doesn't cancel the blast
+            return
+
+        was_bursting = player.burst_triggered
+        player.energy_triggered = False
+        player.burst_triggered = False
+        player.in_kamehameha_zone = False
+        player.energy_center = None
+
+        dist = calculate_velocity(hands[0].center, hands[1].center, dt=1.0)
+
+        # Detect Hand Openness (Fist vs Palm)
+        player.hand_openness = []
+        for track in hands:
+            p_center = track.norm_landmarks[0]
+            m_tip = track.norm_landmarks[12]
+            tip_dist = np.sqrt((p_center[0] - m_tip[0])**2 + (p_center[1] - m_tip[1])**2)
+            # Normalize: fist is around 0.1, full palm around 0.3+
+            openness = np.clip((tip_dist - 0.1) / 0.2, 0, 1)
+            player.hand_openness.append(openness)
+
+        avg_openness = sum(player.hand_openness) / len(player.hand_openness)
+
+        # Increased distance threshold to 400 for better stability
+        if dist < 400:
+            player.in_kamehameha_zone = True
+            player.energy_triggered = True
+            c1, c2 = hands[0].predicted, hands[1].predicted
+            player.energy_center = ((c1[0] + c2[0]) // 2, (c1[1] + c2[1]) // 2)
+
+            # Calculate current combined hand area
+            current_total_area = 0
+            for track in hands:
+                span = track.norm_landmarks.max(axis=0) - track.norm_landmarks.min(axis=0)
+                current_total_area += span[0] * span[1]
+
+            # Continuous Burst Hysteresis:
+            # Trigger at 0.4, but stay bursting until it drops below 0.25
+            threshold = 0.25 if was_bursting else 0.4
+            if player.last_hand_area > 0 and avg_openness > threshold:
+                player.burst_triggered = True
+
+            # Maintain base area for charge tracking
+            if player.last_hand_area == 0 and avg_openness < 0.5:
+                player.last_hand_area = current_total_area
+                print(f"Player {player.id} Charge Initiated. Base Area: {current_total_area:.4f}")
+
+            if self.tick % 5 == 0:
+                state = "BURSTING" if player.burst_triggered else "CHARGING"
+                print(f"SJ Mode [P{player.id}]: {state} | O: {avg_openness:.2f}")
+        else:
+            player.last_hand_area = 0.0
+
+    def set_latency(self, latency):
+        """Sets the capture-to-display latency (seconds) that hand positions are predicted forward by."""
+        self.latency = max(0.0, latency)
 
-        # Update last positions for velocity next frame
-        for i in range(min(len(hand_centers), 2)):
-            self.last_hand_pos[i] = hand_centers[i]
+    def get_players(self):
+        """All current players, ordered by id."""
+        return [self.tracker.players[pid] for pid in sorted(self.tracker.players)]
 
     def is_swipe_triggered(self):
         return self.swipe_triggered
@@ -1,4 +1,5 @@
 import cv2
+from parallel import get_default_executor
 try:
     import mediapipe as mp
     from mediapipe.python.solutions import hands as mp_hands
@@ -13,7 +14,8 @@ except ImportError:
 class HandTracker:
     """MediaPipe Hands integration for 21 landmarks per hand."""
     def __init__(self, static_image_mode=False, max_num_hands=2, 
-                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5, executor=None):
+        self.executor = executor if executor is not None else get_default_executor()
         self.mp_hands = mp_hands
         self.hands = self.mp_hands.Hands(
             static_image_mode=static_image_mode,
@@ -27,6 +29,7 @@ class HandTracker:
     def process(self, frame):
         """Processes the frame and returns hand landmarks."""
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.executor.count_pass()
         results = self.hands.process(rgb_frame)
         return results
 
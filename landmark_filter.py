@@ -0,0 +1,110 @@
+import numpy as np
+
+def smoothing_factor(dt, cutoff):
+    """Exponential smoothing factor for a first-order low-pass at the given cutoff (Hz)."""
+    tau = 1.0 / (2 * np.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+class OneEuroFilter:
+    """One Euro filter over point arrays (a hand center or a full landmark set) with forward prediction."""
+    def __init__(self, min_cutoff=1.0, beta=0.05, d_cutoff=5.0, predict_knee=400.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        # Speed (units/s) at which prediction reaches half strength. Jitter alone reads as a few
+        # tens of px/s, well below the knee, where the quadratic ramp leaves prediction almost off
+        self.predict_knee = predict_knee
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.dx = None
+        self.t = None
+
+    def update(self, x, t):
+        """Filters a new sample x captured at time t (seconds) and returns the smoothed value."""
+        x = np.asarray(x, dtype=float)
+        if self.x is None or self.t is None or t <= self.t:
+            if self.x is None or self.x.shape != x.shape:
+                self.x = x.copy()
+                self.dx = np.zeros_like(x)
+            self.t = t if self.t is None else max(self.t, t)
+            return self.x
+
+        dt = t - self.t
+        self.t = t
+
+        # Smoothed derivative drives the adaptive cutoff: low jitter at rest, low lag in motion
+        a_d = smoothing_factor(dt, self.d_cutoff)
+        self.dx = a_d * (x - self.x) / dt + (1 - a_d) * self.dx
+
+        cutoff = self.min_cutoff + self.beta * self.speed()
+        a = smoothing_factor(dt, cutoff)
+        self.x = a * x + (1 - a) * self.x
+        return self.x
+
+    def speed(self):
+        """Mean magnitude of the smoothed velocity across the filtered points."""
+        if self.dx is None:
+            return 0.0
+        if self.dx.ndim == 0:
+            return float(abs(self.dx))
+        return float(np.linalg.norm(self.dx.reshape(-1, self.dx.shape[-1]), axis=1).mean())
+
+    def predict(self, latency):
+        """Extrapolates the filtered state forward by latency seconds using the velocity estimate."""
+        if self.x is None:
+            return None
+        speed = self.speed()
+        gain = speed ** 2 / (speed ** 2 + self.predict_knee ** 2) if self.predict_knee > 0 else 1.0
+        return self.x + self.dx * latency * gain
+
+def measure_motion_to_photon(timestamps, positions, latency, filt=None):
+    """Replays a (t, xy) trace and returns mean/p95 pixel error between the rendered and true position.
+
+    A sample captured at t is shown at t + latency, so the error is taken against the trace
+    interpolated at display time. With filt=None the raw sample is rendered (no compensation).
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    display_t = timestamps + latency
+    valid = display_t <= timestamps[-1]
+    truth = np.stack([np.interp(display_t, timestamps, positions[:, k]) for k in range(positions.shape[1])], axis=1)
+
+    rendered = np.empty_like(positions)
+    for i, (t, p) in enumerate(zip(timestamps, positions)):
+        if filt is None:
+            rendered[i] = p
+        else:
+            filt.update(p, t)
+            rendered[i] = filt.predict(latency)
+
+    err = np.linalg.norm(rendered - truth, axis=1)[valid]
+    return {"mean": float(err.mean()), "p95": float(np.percentile(err, 95))}
+
+def load_trace(path):
+    """Loads a recorded trace as CSV rows of t,x,y (seconds, pixels)."""
+    data = np.loadtxt(path, delimiter=",", ndmin=2)
+    return data[:, 0], data[:, 1:3]
+
+def synthetic_trace(duration=10.0, fps=30, jitter=2.0, seed=0):
+    """Generates a hand-like sweep with sensor jitter and uneven frame timing."""
+    rng = np.random.default_rng(seed)
+    dt = rng.normal(1.0 / fps, 0.1 / fps, int(duration * fps)).clip(0.5 / fps)
+    t = np.cumsum(dt)
+    x = 640 + 300 * np.sin(2 * np.pi * 0.4 * t) + 80 * np.sin(2 * np.pi * 1.3 * t)
+    y = 360 + 150 * np.sin(2 * np.pi * 0.25 * t + 1.0)
+    positions = np.stack([x, y], axis=1) + rng.normal(0, jitter, (len(t), 2))
+    return t, positions
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        ts, pos = load_trace(sys.argv[1])
+    else:
+        ts, pos = synthetic_trace()
+    for latency in (0.033, 0.066, 0.1):
+        raw = measure_motion_to_photon(ts, pos, latency)
+        filtered = measure_motion_to_photon(ts, pos, latency, OneEuroFilter())
+        print(f"latency {latency * 1000:.0f}ms | raw: mean {raw['mean']:.1f}px p95 {raw['p95']:.1f}px"
+              f" | filtered+predicted: mean {filtered['mean']:.1f}px p95 {filtered['p95']:.1f}px")
@@ -1,21 +1,31 @@
 import cv2
+import time
 import numpy as np
 from camera import Camera
 from face_tracker import FaceTracker
 from hand_tracker import HandTracker
 from gesture_engine import GestureEngine
-from effects_engine import EffectsEngine
+from effects_engine import MultiPlayerEffects
 from background_engine import BackgroundEngine
-from utils import get_landmark_points, get_hand_center
+from compositor import FinalCompositor
+from utils import get_landmark_points
+from parallel import get_default_executor
+
+MAX_PLAYERS = 4
+# Typical webcam exposure-to-read() delay, used when the capture backend has no frame timestamps
+CAPTURE_LATENCY = 0.05
 
 def main():
     # Initialize components
-    cam = Camera()
+    cam = Camera(capture_latency=CAPTURE_LATENCY)
     face_tracker = FaceTracker()
-    hand_tracker = HandTracker()
+    hand_tracker = HandTracker(max_num_hands=2 * MAX_PLAYERS)
     gesture_engine = GestureEngine()
-    effects_engine = EffectsEngine()
+    effects_engine = MultiPlayerEffects()
     background_engine = BackgroundEngine()
+    background_engine.get_segmentor() # Load the model up front rather than on first charge
+    compositor = FinalCompositor()
+    executor = get_default_executor() # Shared by the engines; also counts full-frame passes
 
     # Load Power Asset
     power_asset = cv2.imread("assets/cinematic_kamehameha_ball.png", -1)
@@ -52,6 +62,7 @@ def main():
     print("Project Saiyan AR is running. Press 'q' to quit.")
 
     is_transformed = False
+    latency_ema = None # Smoothed capture-to-display latency (seconds)
 
     while True:
         frame = cam.get_frame()
@@ -59,13 +70,14 @@ def main():
             break
 
         h, w, _ = frame.shape
+        capture_time = cam.last_timestamp
 
         # 1. Processing
         face_results = face_tracker.process(frame)
         hand_results = hand_tracker.process(frame)
 
         # 2. Gesture Detection
-        gesture_engine.update(hand_results, face_results, w, h)
+        gesture_engine.update(hand_results, face_results, w, h, timestamp=capture_time)
         if gesture_engine.is_swipe_triggered():
             is_transformed = not is_transformed # Toggle transformation
             print(f"Gesture Triggered: Face Swap {'Enabled' if is_transformed else 'Disabled'}")
@@ -73,6 +85,7 @@ def main():
 
         # 3. Rendering Logic
         display_frame = frame.copy()
+        executor.count_pass()
 
         # Handle Background Replacement (Phase 4)
         is_bursting = gesture_engine.is_burst_triggered()
@@ -84,50 +97,42 @@ def main():
             if body_mask is not None:
                 display_frame = effects_engine.draw_body_lightning(display_frame, body_mask)
 
-        # Handle Effects (Energy Ball)
-        if gesture_engine.is_energy_triggered():
-            if hand_results.multi_hand_landmarks and len(hand_results.multi_hand_landmarks) >= 2:
-                # Calculate midpoint with base smoothing
-                c1 = get_hand_center(hand_results.multi_hand_landmarks[0], w, h)
-                c2 = get_hand_center(hand_results.multi_hand_landmarks[1], w, h)
-                
-                # Use current burst state
-                is_bursting = gesture_engine.is_burst_triggered()
-                
-                mid_x = (c1[0] + c2[0]) // 2
-                mid_y = (c1[1] + c2[1]) // 2
-                
-                # Render the cinematic energy effect
-                display_frame = effects_engine.draw_energy_ball(
-                    display_frame, (mid_x, mid_y), 60, 
-                    asset=power_asset, burst=is_bursting
-                )
-                
-                if is_bursting:
-                    print("BOOM! Kamehameha Burst Fired!")
+        # Handle Effects (one Energy Ball per player, at the filtered midpoint predicted
+        # forward to when this frame reaches the screen)
+        players = gesture_engine.get_players()
+        display_frame = effects_engine.draw_players(display_frame, players, 60, asset=power_asset)
+        for player in players:
+            if player.burst_triggered:
+                print(f"BOOM! Player {player.id} Kamehameha Burst Fired!")
 
         # Draw hand landmarks (Movement marks)
         if hand_results.multi_hand_landmarks:
             display_frame = hand_tracker.draw_landmarks(display_frame, hand_results)
 
-        # Handle UI Overlay
-        cv2.putText(display_frame, "SUPER SAIYAN MODE: Palms Together to charge", (10, h - 40), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 200, 255), 2)
-        cv2.putText(display_frame, "Push TOWARD Camera to BURST", (10, h - 15), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+        # Handle UI Overlay (pre-rendered sprites, drawn by the compositor)
+        hud = [
+            ("SUPER SAIYAN MODE: Palms Together to charge", (10, h - 40), 0.6, (0, 200, 255), 2),
+            ("Push TOWARD Camera to BURST", (10, h - 15), 0.5, (0, 255, 255), 1),
+        ]
 
-        # 4. Final Polish (Screen Shake)
-        display_frame = effects_engine.apply_screen_shake(display_frame)
+        # 4. Final Polish (Screen Shake + HUD in one pass)
+        display_frame = compositor.compose(display_frame, shake=effects_engine.shake_offset, hud=hud)
 
         # 5. Display
         cv2.imshow("Project Saiyan AR", display_frame)
 
+        # Measure motion-to-photon latency for next frame's prediction
+        frame_latency = time.time() - capture_time
+        latency_ema = frame_latency if latency_ema is None else 0.9 * latency_ema + 0.1 * frame_latency
+        gesture_engine.set_latency(latency_ema)
+
         key = cv2.waitKey(1) & 0xFF
         if key == ord('q'):
             break
         if key == ord('q'):
             break
 
+    print(compositor.report())
     cam.release()
     cv2.destroyAllWindows()
 
@@ -0,0 +1,101 @@
+import os
+import threading
+import cv2
+from concurrent.futures import ThreadPoolExecutor
+
+# cv2.setNumThreads is process-wide: runs in flight on any executor share one saved value
+_cv_threads_lock = threading.Lock()
+_cv_threads_users = 0
+_cv_threads_saved = None
+
+def _limit_opencv_threads():
+    global _cv_threads_users, _cv_threads_saved
+    with _cv_threads_lock:
+        if _cv_threads_users == 0:
+            _cv_threads_saved = cv2.getNumThreads()
+            cv2.setNumThreads(1)
+        _cv_threads_users += 1
+
+def _restore_opencv_threads():
+    global _cv_threads_users
+    with _cv_threads_lock:
+        _cv_threads_users -= 1
+        if _cv_threads_users == 0:
+            cv2.setNumThreads(_cv_threads_saved)
+
+class StripeExecutor:
+    """Splits per-pixel full-frame passes into horizontal stripes run on a persistent thread pool.
+
+    OpenCV and large NumPy operations release the GIL, so stripes run truly in parallel. Each
+    stripe must only read/write its own rows, which keeps results bit-identical to one stripe.
+
+    Many OpenCV calls (warpAffine, GaussianBlur, remap, ...) are also parallel internally. Calling
+    them from every stripe would run stripes x cv2.getNumThreads() threads on the same cores, so
+    while stripes are in flight OpenCV is limited to one thread per call; unstriped calls outside
+    run() keep OpenCV's own threading. run() may be called from several threads at once: the
+    limit is reference-counted, so the original thread count comes back after the last run ends.
+    """
+    def __init__(self, stripes=None, min_rows=64):
+        self.stripes = max(1, stripes if stripes is not None else (os.cpu_count() or 1))
+        self.min_rows = min_rows # Don't split finer than this; tiny stripes cost more than they save
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        # Full-frame memory passes since the last take_pass_count(): every run() plus count_pass() calls
+        self.passes = 0
+
+    def set_stripes(self, stripes):
+        """Changes the stripe/thread count, recreating the pool on next use."""
+        stripes = max(1, int(stripes))
+        if stripes != self.stripes:
+            self.shutdown()
+            self.stripes = stripes
+
+    def bounds(self, height):
+        """Row ranges [(y0, y1), ...] covering height, at most self.stripes of them."""
+        n = max(1, min(self.stripes, height // max(1, self.min_rows)))
+        edges = [height * i // n for i in range(n + 1)]
+        return [(edges[i], edges[i + 1]) for i in range(n) if edges[i + 1] > edges[i]]
+
+    def count_pass(self, n=1):
+        """Records full-frame passes made outside run() (allocations, single-threaded OpenCV calls)."""
+        self.passes += n
+
+    def take_pass_count(self):
+        """Returns the passes counted since the last call and resets the counter."""
+        passes, self.passes = self.passes, 0
+        return passes
+
+    def run(self, fn, height):
+        """Calls fn(y0, y1) for every stripe of a frame with the given height and waits for all."""
+        self.passes += 1
+        bounds = self.bounds(height)
+        if len(bounds) == 1:
+            fn(0, height)
+            return
+        with self.pool_lock:
+            if self.pool is None:
+                # The calling thread takes a stripe itself, so the pool needs one worker fewer
+                self.pool = ThreadPoolExecutor(max_workers=max(1, self.stripes - 1), thread_name_prefix="stripe")
+        _limit_opencv_threads()
+        try:
+            # Main thread takes the first stripe instead of idling on the futures
+            futures = [self.pool.submit(fn, y0, y1) for y0, y1 in bounds[1:]]
+            fn(*bounds[0])
+            for f in futures:
+                f.result()
+        finally:
+            _restore_opencv_threads()
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+
+_default_executor = None
+
+def get_default_executor():
+    """Process-wide executor shared by the engines so they don't each own a pool."""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = StripeExecutor()
+    return _default_executor
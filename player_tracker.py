@@ -0,0 +1,238 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from landmark_filter import OneEuroFilter
+
+class HandTrack:
+    """A hand with a stable identity across frames."""
+    def __init__(self, track_id, landmarks, norm_landmarks, handedness, timestamp):
+        self.id = track_id
+        self.filter = OneEuroFilter()
+        self.landmarks = landmarks            # (21, 2) pixel coordinates, latest detection
+        self.norm_landmarks = norm_landmarks  # (21, 2) normalized coordinates, latest detection
+        self.handedness = handedness          # "Left"/"Right" from MediaPipe, or None
+        self.center = None                    # Filtered center (pixels)
+        self.predicted = None                 # Filtered center extrapolated by the pipeline latency
+        self.prev_center = None               # Filtered center on the previous matched frame
+        self.time = None                      # Capture time of the latest detection
+        self.prev_time = None
+        self.missed = 0
+        self.player_id = None
+        self.observe(landmarks, norm_landmarks, handedness, timestamp)
+
+    def observe(self, landmarks, norm_landmarks, handedness, timestamp):
+        """Feeds a matched detection into the track."""
+        self.prev_center = self.center
+        self.prev_time = self.time
+        self.time = timestamp
+        self.landmarks = landmarks
+        self.norm_landmarks = norm_landmarks
+        if handedness is not None:
+            self.handedness = handedness
+        filtered = self.filter.update(landmarks.mean(axis=0), timestamp)
+        self.center = (int(filtered[0]), int(filtered[1]))
+        self.missed = 0
+
+    def expected_landmarks(self, dt):
+        """Last landmarks shifted by the filtered velocity, for matching against the next frame."""
+        if self.filter.dx is None:
+            return self.landmarks
+        return self.landmarks + self.filter.dx * dt
+
+class Player:
+    """Two hand tracks paired into one player, with that player's gesture state."""
+    def __init__(self, player_id, hand_ids):
+        self.id = player_id
+        self.hand_ids = list(hand_ids)
+        self.last_hand_area = 0.0
+        self.hand_openness = [0, 0] # 0 = Fist, 1 = Palm
+        self.energy_triggered = False
+        self.burst_triggered = False
+        self.in_kamehameha_zone = False
+        self.energy_center = None
+
+class PlayerTracker:
+    """Associates detected hands with persistent tracks (Hungarian assignment) and pairs them into players.
+
+    Distances are fractions of the frame width. Frames are assumed unmirrored (as main captures
+    them): MediaPipe labels assume a selfie view, so a player's "Left" hand appears on the image
+    left of their "Right" hand. Pass mirrored=True for flipped frames.
+    """
+    def __init__(self, max_match_dist=0.15, max_pair_dist=0.5, max_missed=5, label_weight=0.005,
+                 pair_hysteresis=0.1, cross_tolerance=0.02, pair_candidates=3, mirrored=False):
+        self.max_match_dist = max_match_dist   # How far a hand may move between frames
+        self.max_pair_dist = max_pair_dist     # How far apart a player's two hands may be
+        self.max_missed = max_missed           # Frames a track survives without a detection
+        # Left/Right labels flicker (and are often wrong with palms together), so a disagreeing
+        # label only costs this much: a tie-breaker well below the spacing between hands
+        self.label_weight = label_weight
+        self.pair_hysteresis = pair_hysteresis # Bonus for keeping an existing pair
+        self.cross_tolerance = cross_tolerance # How far a new pair's hands may sit on the wrong sides
+        self.pair_candidates = pair_candidates # Nearest hands considered as a hand's partner
+        self.mirrored = mirrored
+        self.tracks = {}
+        self.players = {}
+        self.next_track_id = 0
+        self.next_player_id = 0
+
+    def update(self, detections, width, timestamp):
+        """Matches detections [(landmarks_px, landmarks_norm, handedness), ...] to tracks.
+
+        Returns the list of tracks seen this frame, in detection order.
+        """
+        track_ids = list(self.tracks)
+        matched = [None] * len(detections)
+
+        if track_ids and detections:
+            det = np.stack([d[0] for d in detections])                                  # (N, 21, 2)
+            # Each track is extrapolated over its own gap, which spans several frames if it was missed
+            trk = np.stack([self.tracks[t].expected_landmarks(max(0.0, timestamp - self.tracks[t].time))
+                            for t in track_ids])                                        # (M, 21, 2)
+            cost = np.linalg.norm(det[:, None] - trk[None], axis=-1).mean(axis=-1)      # (N, M)
+            # Break ties in favour of matches that agree with MediaPipe's Left/Right label
+            for i, d in enumerate(detections):
+                for j, t in enumerate(track_ids):
+                    hd, ht = d[2], self.tracks[t].handedness
+                    if hd is not None and ht is not None and hd != ht:
+                        cost[i, j] += self.label_weight * width
+            rows, cols = linear_sum_assignment(cost)
+            for i, j in zip(rows, cols):
+                if cost[i, j] <= self.max_match_dist * width:
+                    matched[i] = track_ids[j]
+
+        seen = []
+        for i, (landmarks, norm_landmarks, handedness) in enumerate(detections):
+            if matched[i] is None:
+                track = HandTrack(self.next_track_id, landmarks, norm_landmarks, handedness, timestamp)
+                self.tracks[track.id] = track
+                self.next_track_id += 1
+            else:
+                track = self.tracks[matched[i]]
+                track.observe(landmarks, norm_landmarks, handedness, timestamp)
+            seen.append(track)
+
+        seen_ids = {t.id for t in seen}
+        for track_id in list(self.tracks):
+            if track_id not in seen_ids:
+                self.tracks[track_id].missed += 1
+                if self.tracks[track_id].missed > self.max_missed:
+                    self.drop_track(track_id)
+
+        self.pair_hands(width)
+        return seen
+
+    def drop_track(self, track_id):
+        """Removes a track and dissolves the player it belonged to."""
+        track = self.tracks.pop(track_id)
+        if track.player_id is not None:
+            self.dissolve_player(track.player_id)
+
+    def dissolve_player(self, player_id):
+        """Removes a player, freeing its tracks for re-pairing."""
+        player = self.players.pop(player_id, None)
+        if player is None: return
+        for track_id in player.hand_ids:
+            if track_id in self.tracks:
+                self.tracks[track_id].player_id = None
+
+    def pair_cost(self, ta, tb, width):
+        """Cost of ta and tb being one player's hands (lower is better, negative pays), or None if implausible."""
+        dx, dy = tb.center[0] - ta.center[0], tb.center[1] - ta.center[1]
+        dist = np.hypot(dx, dy)
+        if dist > self.max_pair_dist * width:
+            return None
+        paired = ta.player_id is not None and ta.player_id == tb.player_id
+        labels = {ta.handedness, tb.handedness}
+        if labels == {"Left", "Right"}:
+            # Left hand must be on its expected side of the Right hand; an existing pair may cross its arms
+            left, right = (ta, tb) if ta.handedness == "Left" else (tb, ta)
+            side = (right.center[0] - left.center[0]) * (-1 if self.mirrored else 1)
+            if not paired and side < -self.cross_tolerance * width:
+                return None
+        else:
+            dist += self.label_weight * width
+        # Every pair pays for itself up to max_pair_dist, so more (and tighter) pairs are preferred
+        cost = dist - self.max_pair_dist * width
+        if paired:
+            cost -= self.pair_hysteresis * width
+        return cost
+
+    def pair_hands(self, width):
+        """Re-pairs all detected tracks into players as a global min-cost matching, favouring existing pairs.
+
+        Players with a hand missing this frame are kept as they are until the track is dropped.
+        """
+        free = [t for t in self.tracks.values()
+                if t.missed == 0 and (t.player_id is None or not self.player_missing(t.player_id))]
+        free.sort(key=lambda t: t.center[0])
+        n = len(free)
+        costs = [dict() for _ in range(n)]
+        for a in range(n):
+            options = []
+            for b in range(n):
+                if a != b:
+                    cost = self.pair_cost(free[a], free[b], width)
+                    if cost is not None:
+                        options.append((cost, b))
+            for cost, b in sorted(options)[:self.pair_candidates]:
+                costs[min(a, b)][max(a, b)] = cost
+
+        pairs = self.best_matching(costs)
+        kept = set()
+        for a, b in pairs:
+            ta, tb = free[a], free[b]
+            if ta.player_id is not None and ta.player_id == tb.player_id:
+                kept.add(ta.player_id)
+        for t in free:
+            if t.player_id is not None and t.player_id not in kept:
+                self.dissolve_player(t.player_id)
+        for a, b in pairs:
+            ta, tb = free[a], free[b]
+            if ta.player_id is None:
+                player = Player(self.next_player_id, (ta.id, tb.id))
+                self.next_player_id += 1
+                self.players[player.id] = player
+                ta.player_id = tb.player_id = player.id
+
+    @staticmethod
+    def best_matching(costs):
+        """Exact min-cost matching where costs[a][b] (a < b) lists the allowed pairs; returns [(a, b), ...].
+
+        Nodes are sorted by x and only a few nearest partners are allowed, so the lowest-free-node
+        recursion stays small.
+        """
+        memo = {}
+
+        def solve(mask):
+            if mask == 0:
+                return 0.0, ()
+            if mask in memo:
+                return memo[mask]
+            a = (mask & -mask).bit_length() - 1
+            rest = mask & ~(1 << a)
+            best = solve(rest) # a stays unpaired
+            for b, cost in costs[a].items():
+                if rest >> b & 1:
+                    sub_cost, sub_pairs = solve(rest & ~(1 << b))
+                    if sub_cost + cost < best[0]:
+                        best = (sub_cost + cost, sub_pairs + ((a, b),))
+            memo[mask] = best
+            return best
+
+        return list(solve((1 << len(costs)) - 1)[1])
+
+    def player_missing(self, player_id):
+        """True if any of the player's hands was not detected this frame."""
+        return any(t not in self.tracks or self.tracks[t].missed > 0 for t in self.players[player_id].hand_ids)
+
+    def predict(self, latency):
+        """Updates every live track's forward-predicted center."""
+        for track in self.tracks.values():
+            p = track.filter.predict(latency)
+            track.predicted = None if p is None else (int(p[0]), int(p[1]))
+
+    def player_hands(self, player):
+        """The player's two tracks if both were detected this frame, else None."""
+        hands = [self.tracks.get(t) for t in player.hand_ids]
+        if any(h is None or h.missed > 0 for h in hands):
+            return None
+        return hands
@@ -0,0 +1,72 @@
+import json
+import time
+
+import pytest
+
+import benchmark
+from benchmark import check_regressions, load_baseline, time_sample
+
+def result(ms, alloc=1000):
+    return {"median_ms": ms, "min_ms": ms, "peak_alloc_bytes": alloc}
+
+def baseline(results, budgets=None):
+    return {"meta": {}, "budgets": budgets or {}, "results": results}
+
+def test_within_budget_passes():
+    base = baseline({"draw_dust@720p": result(10.0)})
+    assert check_regressions({"draw_dust@720p": result(11.9)}, base, 0.2) == []
+
+def test_slowdown_over_budget_fails():
+    base = baseline({"draw_dust@720p": result(10.0)})
+    (msg,) = check_regressions({"draw_dust@720p": result(12.5)}, base, 0.2)
+    assert msg.startswith("draw_dust@720p") and "ms" in msg
+
+def test_per_primitive_budget_overrides_default():
+    results = {"draw_dust@720p": result(12.5), "draw_rocks@720p": result(10.6)}
+    base = baseline({"draw_dust@720p": result(10.0), "draw_rocks@720p": result(10.0)},
+                    budgets={"draw_dust": 0.5, "draw_rocks": 0.05})
+    failures = check_regressions(results, base, 0.2)
+    assert len(failures) == 1 and failures[0].startswith("draw_rocks@720p")
+
+def test_floor_ignores_tiny_absolute_slowdowns():
+    base = baseline({"compose@720p": result(0.02)})
+    assert check_regressions({"compose@720p": result(0.04)}, base, 0.2, floor_ms=0.05) == []
+    assert len(check_regressions({"compose@720p": result(0.04)}, base, 0.2, floor_ms=0.0)) == 1
+
+def test_allocation_over_budget_fails_even_when_fast():
+    base = baseline({"draw_burst@720p": result(10.0, alloc=1000)})
+    (msg,) = check_regressions({"draw_burst@720p": result(9.0, alloc=1300)}, base, 0.2)
+    assert "1300 B" in msg
+
+def test_primitives_missing_from_baseline_are_skipped():
+    assert check_regressions({"compose@4k": result(99.0)}, baseline({}), 0.2) == []
+
+def test_load_baseline(tmp_path, capsys):
+    assert load_baseline(str(tmp_path / "missing.json")) is None
+    assert "--save" in capsys.readouterr().err
+
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    assert load_baseline(str(broken)) is None
+
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps(baseline({"compose@720p": result(1.0)})))
+    assert load_baseline(str(good))["results"]["compose@720p"]["median_ms"] == 1.0
+
+def test_check_without_baseline_exits_before_running(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark, "run_all", lambda *a, **k: pytest.fail("benchmarks ran"))
+    assert benchmark.main(["--check", "--baseline", str(tmp_path / "missing.json")]) == 1
+
+def test_time_sample_repeats_fast_calls_until_min_ms():
+    calls = []
+    per_call = time_sample(lambda: calls.append(1), min_ms=20.0)
+    assert len(calls) > 100
+    assert per_call * len(calls) >= 20.0
+
+def test_time_sample_calls_slow_functions_once():
+    calls = []
+    def slow():
+        calls.append(1)
+        time.sleep(0.03)
+    assert time_sample(slow, min_ms=10.0) >= 30.0
+    assert len(calls) == 1
@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+import pytest
+
+from effects_engine import EffectsEngine
+
+def halo_layer(w, h):
+    """Energy ball halos as drawn by draw_energy_ball (radius 60, no pulse)."""
+    layer = np.zeros((h, w, 3), dtype=np.uint8)
+    s = h / 720
+    cv2.circle(layer, (w // 2, h // 2), int(150 * s), (0, 120, 200), -1)
+    cv2.circle(layer, (w // 2, h // 2), int(108 * s), (50, 200, 255), -1)
+    return layer
+
+def burst_layer(w, h):
+    """Shockwave rings plus the r=400 disc from draw_burst, which runs off the bottom edge at 720p."""
+    layer = np.zeros((h, w, 3), dtype=np.uint8)
+    center = (w // 2, h // 2)
+    for i in range(3):
+        cv2.circle(layer, center, 100 + i * 50, (255, 255, 255), 10 - i * 2)
+    cv2.circle(layer, center, 400, (0, 180, 255), -1)
+    return layer
+
+def centroid(img):
+    g = img[:, :, 0].astype(np.float64)
+    yy, xx = np.mgrid[:g.shape[0], :g.shape[1]]
+    return (g * xx).sum() / g.sum(), (g * yy).sum() / g.sum()
+
+@pytest.mark.parametrize("make_layer", [halo_layer, burst_layer])
+def test_bloom_matches_original_blur_at_720p(make_layer):
+    layer = make_layer(1280, 720)
+    reference = cv2.GaussianBlur(layer, (99, 99), 0)
+    out = EffectsEngine().apply_bloom(layer)
+    diff = np.abs(out.astype(int) - reference.astype(int))
+    assert out.shape == layer.shape and out.dtype == np.uint8
+    assert diff.mean() < 0.1
+    assert diff.max() <= 2
+
+def test_bloom_radius_is_screen_relative():
+    fx = EffectsEngine()
+    layer = halo_layer(1920, 1080)
+    reference = cv2.GaussianBlur(layer, (0, 0), fx.bloom_radius * 1080)
+    diff = np.abs(fx.apply_bloom(layer).astype(int) - reference.astype(int))
+    assert diff.max() <= 2
+
+@pytest.mark.parametrize("falloff", [0.0, 0.5])
+def test_bloom_stays_centred(falloff):
+    layer = np.zeros((720, 1280, 3), dtype=np.uint8)
+    cv2.circle(layer, (640, 360), 3, (255, 255, 255), -1)
+    fx = EffectsEngine()
+    fx.bloom_falloff = falloff
+    cx, cy = centroid(fx.apply_bloom(layer))
+    assert abs(cx - 640) < 0.25 and abs(cy - 360) < 0.25
+
+def test_bloom_falloff_accumulates_finer_levels():
+    layer = halo_layer(1280, 720)
+    fx = EffectsEngine()
+    single = fx.apply_bloom(layer).astype(int)
+    fx.bloom_falloff = 0.5
+    multi = fx.apply_bloom(layer).astype(int)
+    # Finer levels sharpen the halo edge: brighter inside, dimmer outside, same overall energy
+    assert multi[360, 640 + 100, 2] > single[360, 640 + 100, 2]
+    assert abs(multi.sum() - single.sum()) / single.sum() < 0.02
@@ -0,0 +1,36 @@
+import time
+
+import cv2
+import pytest
+
+from camera import Camera
+
+class StubCapture:
+    """Stands in for cv2.VideoCapture, reporting a fixed CAP_PROP_POS_MSEC."""
+    def __init__(self, pos_msec):
+        self.pos_msec = pos_msec
+
+    def get(self, prop):
+        assert prop == cv2.CAP_PROP_POS_MSEC
+        return self.pos_msec
+
+def camera(pos_msec, capture_latency=0.05):
+    cam = Camera.__new__(Camera) # Skip opening a real device
+    cam.cap = StubCapture(pos_msec)
+    cam.capture_latency = capture_latency
+    return cam
+
+def test_monotonic_buffer_timestamp_gives_frame_age():
+    read_time = time.time()
+    cam = camera((time.monotonic() - 0.030) * 1000.0)
+    assert read_time - cam.capture_timestamp(read_time) == pytest.approx(0.030, abs=0.005)
+
+@pytest.mark.parametrize("pos_msec", [
+    1234.0,                           # Stream position (ms since the capture started)
+    (time.monotonic() + 5) * 1000.0,  # In the future: not on our clock
+    0.0,                              # Not reported
+    -1.0,
+])
+def test_other_values_fall_back_to_capture_latency(pos_msec):
+    read_time = time.time()
+    assert camera(pos_msec).capture_timestamp(read_time) == pytest.approx(read_time - 0.05)
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from background_engine import BackgroundEngine
+from compositor import FinalCompositor
+from effects_engine import EffectsEngine
+from parallel import StripeExecutor
+
+def random_frame(seed, scale=1):
+    rng = np.random.default_rng(seed)
+    return (rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8) // scale).astype(np.uint8)
+
+@pytest.mark.parametrize("flash", [0.0, 0.2, 0.4])
+def test_additive_blend_matches_separate_passes(flash):
+    background, overlay = random_frame(0), random_frame(1, scale=2)
+    # Original sequence: 5% exposure, add, then blend toward white
+    reference = cv2.add(cv2.addWeighted(background, 1.0, background, 0.05, 0), overlay)
+    if flash > 0:
+        reference = cv2.addWeighted(reference, 1.0 - flash, np.full_like(reference, 255), flash, 0)
+    out = EffectsEngine(StripeExecutor(stripes=4)).additive_blend(background, overlay, flash)
+    # The fused pass rounds once instead of two or three times
+    assert np.abs(out.astype(int) - reference.astype(int)).max() <= 1
+
+def test_compose_shakes_and_counts_frame_passes():
+    executor = StripeExecutor(stripes=4)
+    fx = EffectsEngine(executor)
+    compositor = FinalCompositor(executor=executor)
+    frame = fx.additive_blend(random_frame(0), np.zeros((720, 1280, 3), dtype=np.uint8))
+    out = compositor.compose(frame, shake=(5, -3))
+    assert np.array_equal(out[:-3, 5:], frame[3:, :-5])
+    assert not out[-3:].any() and not out[:, :5].any()
+    assert compositor.passes == 2
+    compositor.compose(frame)
+    assert compositor.passes == 1
+    assert compositor.report() == "Compositor: 1.50 full-frame passes/frame"
+
+@pytest.mark.parametrize("shake", [(0, 0), (15, 15), (-15, 7), (0, -300), (2000, 0)])
+def test_striped_compose_matches_single_stripe(shake):
+    frame = random_frame(2)
+    single = FinalCompositor(executor=StripeExecutor(stripes=1)).compose(frame, shake=shake).copy()
+    striped = FinalCompositor(executor=StripeExecutor(stripes=4)).compose(frame, shake=shake)
+    reference = cv2.warpAffine(frame, np.float32([[1, 0, shake[0]], [0, 1, shake[1]]]), (1280, 720))
+    assert np.array_equal(single, reference)
+    assert np.array_equal(striped, reference)
+
+def test_segmentation_mask_passes_are_counted():
+    executor = StripeExecutor(stripes=4)
+    background = BackgroundEngine(executor)
+    mask = np.zeros((720, 1280), dtype=np.float32)
+    mask[200:600, 400:900] = 0.9
+    background.segmentor = SimpleNamespace(process=lambda rgb: SimpleNamespace(segmentation_mask=mask))
+    # The path main takes while charging: mask only, no background image
+    frame = random_frame(0)
+    out, mask_raw = background.replace_background(frame, background_layers=None)
+    assert out is frame and mask_raw.dtype == np.float32
+    assert executor.take_pass_count() == 3 # BGR->RGB, threshold, float conversion
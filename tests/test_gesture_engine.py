@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from gesture_engine import GestureEngine
+
+NO_FACE = SimpleNamespace(multi_face_landmarks=None)
+
+def hand(cx, cy, label, open_palm):
+    """MediaPipe-shaped hand: 21 landmarks around (cx, cy), middle fingertip far from the wrist if open."""
+    angles = np.linspace(0, 2 * np.pi, 21)
+    pts = np.stack([np.cos(angles), np.sin(angles)], axis=1) * 0.03 + (cx, cy)
+    pts[12] = pts[0] + (0.0, -0.35 if open_palm else -0.05)
+    landmarks = SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y)) for x, y in pts])
+    return landmarks, SimpleNamespace(classification=[SimpleNamespace(label=label)])
+
+def results(*hands):
+    return SimpleNamespace(multi_hand_landmarks=[h[0] for h in hands], multi_handedness=[h[1] for h in hands])
+
+def test_burst_survives_a_brief_hand_dropout(capsys):
+    engine = GestureEngine()
+    t = 0.0
+    def step(res):
+        nonlocal t
+        engine.update(res, NO_FACE, 1280, 720, timestamp=t)
+        t += 1 / 30
+
+    for _ in range(2):
+        step(results(hand(0.45, 0.5, "Left", False), hand(0.55, 0.5, "Right", False)))
+    step(results(hand(0.45, 0.5, "Left", True), hand(0.55, 0.5, "Right", True)))
+    (player,) = engine.get_players()
+    assert player.burst_triggered
+
+    # One hand lost for up to max_missed frames: the burst and its position hold
+    center = player.energy_center
+    for _ in range(engine.tracker.max_missed):
+        step(results(hand(0.45, 0.5, "Left", True)))
+        assert engine.is_burst_triggered() and player.burst_triggered
+        assert player.energy_center == center
+
+    # Lost for longer: the player dissolves and nothing is bursting
+    step(results(hand(0.45, 0.5, "Left", True)))
+    assert engine.get_players() == [] and not engine.is_burst_triggered()
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from landmark_filter import OneEuroFilter, measure_motion_to_photon, synthetic_trace
+
+def jitter(positions):
+    """RMS distance from the mean position, per axis."""
+    return float(np.sqrt(((positions - positions.mean(axis=0)) ** 2).sum(axis=1).mean() / 2))
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_hand_at_rest_renders_steadier_than_raw(seed):
+    rng = np.random.default_rng(seed)
+    t = np.arange(600) / 30.0
+    raw = np.array([640.0, 360.0]) + rng.normal(0, 2.0, (len(t), 2))
+    filt = OneEuroFilter()
+    filtered, predicted = [], []
+    for ti, p in zip(t, raw):
+        filtered.append(filt.update(p, ti))
+        predicted.append(filt.predict(0.066))
+    # Skip the first two seconds while the filter settles
+    raw, filtered, predicted = raw[60:], np.array(filtered)[60:], np.array(predicted)[60:]
+    assert jitter(filtered) < 0.6 * jitter(raw)
+    # What is actually drawn: prediction must not hand the jitter back
+    assert jitter(predicted) < 0.65 * jitter(raw)
+
+@pytest.mark.parametrize("latency", [0.033, 0.066, 0.1])
+def test_prediction_lowers_motion_to_photon_error(latency):
+    timestamps, positions = synthetic_trace()
+    raw = measure_motion_to_photon(timestamps, positions, latency)
+    predicted = measure_motion_to_photon(timestamps, positions, latency, OneEuroFilter())
+    assert predicted["mean"] < 0.6 * raw["mean"]
+    assert predicted["p95"] < raw["p95"]
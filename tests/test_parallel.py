@@ -0,0 +1,70 @@
+import random
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from background_engine import BackgroundEngine
+from benchmark import synthetic_frame, synthetic_mask
+from effects_engine import EffectsEngine
+from parallel import StripeExecutor
+
+W, H = 1280, 720
+
+def render(name, executor):
+    """Runs one striped primitive on fixed inputs (and fixed particle randomness)."""
+    rng = np.random.default_rng(0)
+    random.seed(0)
+    frame = synthetic_frame(W, H, rng)
+    if name == "composite_background":
+        return BackgroundEngine(executor).composite_background(frame, synthetic_mask(W, H), synthetic_frame(W, H, rng))
+    fx = EffectsEngine(executor)
+    if name == "additive_blend":
+        return fx.additive_blend(frame, synthetic_frame(W, H, rng) // 4, flash=0.3)
+    if name == "draw_dust":
+        return fx.draw_dust(frame)
+    if name == "draw_rocks":
+        for _ in range(30): # Let some rocks fly in
+            frame = fx.draw_rocks(frame, (W // 2, H // 2), 60)
+        return frame
+    if name == "apply_screen_shake":
+        fx.shake_offset = (7, -5)
+        return fx.apply_screen_shake(frame)
+    raise ValueError(name)
+
+@pytest.mark.parametrize("stripes", [3, 7, 16])
+@pytest.mark.parametrize("name", ["additive_blend", "draw_dust", "draw_rocks", "apply_screen_shake",
+                                  "composite_background"])
+def test_striped_output_is_bit_identical(name, stripes):
+    single = render(name, StripeExecutor(stripes=1))
+    striped = render(name, StripeExecutor(stripes=stripes, min_rows=16))
+    assert striped.dtype == single.dtype and np.array_equal(striped, single)
+
+def test_opencv_threads_restored_after_concurrent_runs():
+    before = cv2.getNumThreads()
+    cv2.setNumThreads(3)
+    executors = [StripeExecutor(stripes=4), StripeExecutor(stripes=4)]
+    seen = []
+    barrier = threading.Barrier(2)
+
+    def stripe(y0, y1):
+        seen.append(cv2.getNumThreads())
+
+    def caller(executor):
+        for _ in range(50):
+            barrier.wait()
+            executor.run(stripe, H)
+
+    threads = [threading.Thread(target=caller, args=(e,)) for e in executors]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    restored = cv2.getNumThreads()
+    cv2.setNumThreads(before)
+    assert set(seen) == {1}
+    assert restored == 3
+
+def test_pool_leaves_a_stripe_to_the_caller():
+    executor = StripeExecutor(stripes=4)
+    executor.run(lambda y0, y1: None, H)
+    assert executor.pool._max_workers == 3
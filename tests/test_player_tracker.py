@@ -0,0 +1,113 @@
+import contextlib
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from benchmark import count_correct_pairs, synthetic_multi_hand_trace
+from effects_engine import MultiPlayerEffects
+from gesture_engine import GestureEngine
+from parallel import StripeExecutor
+from player_tracker import Player, PlayerTracker
+
+WIDTH, HEIGHT = 1280, 720
+NO_FACE = SimpleNamespace(multi_face_landmarks=None)
+
+def detection(cx, cy, label):
+    """(landmarks_px, landmarks_norm, handedness) for a hand of 21 points around (cx, cy) in pixels."""
+    angles = np.linspace(0, 2 * np.pi, 21)
+    px = np.stack([np.cos(angles), np.sin(angles)], axis=1) * 30 + (cx, cy)
+    return px, px / (WIDTH, HEIGHT), label
+
+def pairs(tracker):
+    return sorted(tuple(sorted(p.hand_ids)) for p in tracker.players.values())
+
+@pytest.mark.parametrize("scenario", ["spread", "close", "crossing"])
+@pytest.mark.parametrize("players", [2, 8])
+def test_trace_keeps_ids_and_pairs_every_frame(scenario, players):
+    engine = GestureEngine()
+    identities, true_of_track = {}, {}
+    for t, results, true_ids in synthetic_multi_hand_trace(players, 90, scenario=scenario):
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.update(results, NO_FACE, WIDTH, HEIGHT, timestamp=t)
+        # Detections arrive shuffled; tracks come back in detection order
+        for true_id, track in zip(true_ids, engine.hand_tracks):
+            identities.setdefault(true_id, set()).add(track.id)
+            true_of_track[track.id] = true_id
+        assert count_correct_pairs(engine.get_players(), true_of_track) == players
+    assert all(len(ids) == 1 for ids in identities.values())
+    # Pairs never broke up and re-formed
+    assert engine.tracker.next_player_id == players
+
+def test_mislabelled_hands_still_pair():
+    # Palms together are often both labelled the same; the label is only a tie-breaker
+    tracker = PlayerTracker()
+    tracker.update([detection(600, 360, "Right"), detection(660, 360, "Right")], WIDTH, 0.0)
+    assert pairs(tracker) == [(0, 1)]
+
+def test_new_pair_needs_hands_on_their_sides():
+    tracker = PlayerTracker()
+    # Unmirrored frame: the "Left" hand belongs on the image left; these two are far on the wrong sides
+    tracker.update([detection(700, 360, "Left"), detection(500, 360, "Right")], WIDTH, 0.0)
+    assert pairs(tracker) == []
+
+    tracker = PlayerTracker(mirrored=True)
+    tracker.update([detection(700, 360, "Left"), detection(500, 360, "Right")], WIDTH, 0.0)
+    assert pairs(tracker) == [(0, 1)]
+
+def test_existing_pair_may_cross_arms():
+    tracker = PlayerTracker()
+    t = 0.0
+    for left_x, right_x in [(500, 700), (560, 640), (620, 580), (700, 500)]:
+        tracker.update([detection(left_x, 360, "Left"), detection(right_x, 360, "Right")], WIDTH, t)
+        t += 1 / 30
+    assert pairs(tracker) == [(0, 1)] and list(tracker.players) == [0]
+
+def test_pairs_are_solved_globally():
+    # Greedy nearest-first would pair 1 with 2 (80 px) and strand 0 and 3
+    tracker = PlayerTracker()
+    tracker.update([detection(400, 360, "Left"), detection(500, 360, "Right"),
+                    detection(580, 360, "Left"), detection(680, 360, "Right")], WIDTH, 0.0)
+    assert pairs(tracker) == [(0, 1), (2, 3)]
+
+def test_track_expires_after_max_missed():
+    tracker = PlayerTracker(max_missed=3)
+    hands = [detection(600, 360, "Left"), detection(680, 360, "Right")]
+    tracker.update(hands, WIDTH, 0.0)
+    for i in range(3):
+        tracker.update(hands[:1], WIDTH, (i + 1) / 30)
+        assert 1 in tracker.tracks and tracker.tracks[1].missed == i + 1
+        assert tracker.player_hands(tracker.players[0]) is None
+    tracker.update(hands[:1], WIDTH, 4 / 30)
+    assert 1 not in tracker.tracks and tracker.players == {}
+    assert tracker.tracks[0].player_id is None
+
+def test_missed_track_is_extrapolated_over_its_whole_gap():
+    tracker = PlayerTracker()
+    t, x = 0.0, 100.0
+    for _ in range(20): # Steady 60 px/frame sweep
+        tracker.update([detection(x, 360, "Left")], WIDTH, t)
+        t, x = t + 1 / 30, x + 60
+    for _ in range(4): # Hidden for 4 frames
+        tracker.update([], WIDTH, t)
+        t, x = t + 1 / 30, x + 60
+    # Reappears 300 px from where it was last seen; one frame of extrapolation would leave it
+    # 240 px off, beyond max_match_dist * width (192 px)
+    (track,) = tracker.update([detection(x, 360, "Left")], WIDTH, t)
+    assert track.id == 0
+
+def test_draw_players_drops_effects_of_departed_players():
+    effects = MultiPlayerEffects(StripeExecutor(stripes=1))
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    a, b = Player(0, (0, 1)), Player(1, (2, 3))
+    a.energy_center, b.energy_center = (80, 120), (240, 120)
+    b.burst_triggered = True
+    effects.draw_players(frame, [a, b], 20)
+    assert set(effects.players) == {0, 1} and effects.players[1].burst_timer > 0
+
+    # Player 1 re-forms as player 2: it starts fresh, not with player 1's burst
+    c = Player(2, (2, 3))
+    c.energy_center = (240, 120)
+    effects.draw_players(frame, [a, c], 20)
+    assert set(effects.players) == {0, 2} and effects.players[2].burst_timer == 0
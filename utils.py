@@ -14,6 +14,10 @@ def get_hand_center(hand_landmarks, width, height):
     count = len(hand_landmarks.landmark)
     return (int(x_sum / count * width), int(y_sum / count * height))
 
+def get_landmark_array(hand_landmarks):
+    """Returns MediaPipe landmarks as an (N, 2) array of normalized (x, y)."""
+    return np.array([(lm.x, lm.y) for lm in hand_landmarks.landmark], dtype=float)
+
 def calculate_velocity(pos1, pos2, dt=1.0):
     """Calculates velocity between two points."""
     if pos1 is None or pos2 is None: